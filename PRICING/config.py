@@ -1,57 +1,49 @@
-import os
+from os import environ
+from dataclasses import dataclass
 from pathlib import Path
 
 
+_APP_ROOT = Path(__file__).parent.parent
+
+
+@dataclass(frozen=True, slots=True)
 class Config:
-    def __init__(self):
-        self.app_root = Path(__file__).parent.parent
-        
-    @property
-    def openai_api_key(self) -> str:
-        return os.getenv('OPENAI_API_KEY', '')
-    
-    @property
-    def openai_model(self) -> str:
-        return os.getenv('OPENAI_MODEL', 'gpt-4o-2024-08-06')
-    
-    @property
-    def max_retries(self) -> int:
-        return int(os.getenv('MAX_RETRIES', '3'))
-    
-    @property
-    def system_prompt_path(self) -> str:
-        default_path = '/app/prompts/system_prompt.md'
-        return os.getenv('SYSTEM_PROMPT_PATH', default_path)
-
-    @property
-    def user_prompt_path(self) -> str:
-        default_path = '/app/prompts/user_prompt.md'
-        return os.getenv('USER_PROMPT_PATH', default_path)
-    
-    @property
-    def default_output_dir(self) -> str:
-        default_path = self.app_root / 'outputs'
-        return os.getenv('OUTPUT_DIR', str(default_path))
-    
-    @property
-    def db_host(self) -> str:
-        return os.getenv('DB_HOST', 'host.docker.internal')
-    
-    @property
-    def db_port(self) -> int:
-        return int(os.getenv('DB_PORT', '5433'))
-    
-    @property
-    def db_name(self) -> str:
-        return os.getenv('DB_NAME', 'insors_db')
-    
-    @property
-    def db_user(self) -> str:
-        return os.getenv('DB_USER', 'insors_demo')
-    
-    @property
-    def db_password(self) -> str:
-        return os.getenv('DB_PASSWORD', 'p@ssW0rd!')
+    # Values are read from the environment once, when this module is imported
+    app_root: Path = _APP_ROOT
+
+    openai_api_key: str = environ.get('OPENAI_API_KEY', '')
+    openai_model: str = environ.get('OPENAI_MODEL', 'gpt-4o-2024-08-06')
+    max_retries: int = int(environ.get('MAX_RETRIES', '3'))
+    max_workers: int = int(environ.get('MAX_WORKERS', '8'))
+    log_level: str = environ.get('LOG_LEVEL', 'INFO').upper()
+    # PDFs longer than this many pages are extracted in parallel page chunks; 0 (the default)
+    # sends every PDF whole, as chunked extractions are merged and can differ
+    chunk_pages: int = int(environ.get('CHUNK_PAGES', '0'))
+    # Account quota for proactive throttling of OpenAI calls; 0 disables the limit
+    openai_requests_per_minute: int = int(environ.get('OPENAI_REQUESTS_PER_MINUTE', '0'))
+    openai_tokens_per_minute: int = int(environ.get('OPENAI_TOKENS_PER_MINUTE', '0'))
+
+    system_prompt_path: str = environ.get('SYSTEM_PROMPT_PATH', '/app/prompts/system_prompt.md')
+    user_prompt_path: str = environ.get('USER_PROMPT_PATH', '/app/prompts/user_prompt.md')
+    default_output_dir: str = environ.get('OUTPUT_DIR', str(_APP_ROOT / 'outputs'))
+    # Content-addressed extraction cache, off unless a directory is given; entries are not
+    # evicted, so point it at a volume that is pruned or sized for it
+    cache_dir: str = environ.get('EXTRACTION_CACHE_DIR', '')
+
+    db_host: str = environ.get('DB_HOST', 'host.docker.internal')
+    db_port: int = int(environ.get('DB_PORT', '5433'))
+    db_name: str = environ.get('DB_NAME', 'insors_db')
+    db_user: str = environ.get('DB_USER', 'insors_demo')
+    db_password: str = environ.get('DB_PASSWORD', 'p@ssW0rd!')
+    # Set when DB_HOST/DB_PORT point at PgBouncer (transaction pooling); the app then keeps no pool of its own
+    db_pgbouncer: bool = environ.get('DB_PGBOUNCER', '').lower() in ('1', 'true', 'yes')
+    # Trusted ingest pipelines only: bulk COPY of child rows skips foreign key and trigger
+    # checks (session_replication_role = replica, which needs a superuser database role)
+    db_trusted_ingest: bool = environ.get('DB_TRUSTED_INGEST', '').lower() in ('1', 'true', 'yes')
+    # Delay between storing contracts and refreshing the materialized analytics views
+    analytics_refresh_seconds: float = float(environ.get('ANALYTICS_REFRESH_SECONDS', '60'))
+    # maintenance_work_mem for each index build session in postgres_docker/create_tables.py
+    index_maintenance_work_mem: str = environ.get('INDEX_MAINTENANCE_WORK_MEM', '128MB')
 
 
 config = Config()
\ No newline at end of file
@@ -8,31 +8,56 @@ using OpenAI GPT-4o and storing results in PostgreSQL database.
 
 import sys
 from pathlib import Path
-sys.path.append(str(Path(__file__).parent.parent))
-
 import os
+import io
+import re
 import json
-import tempfile
-import shutil
+import csv
+import stat
+import time
+import random
 import hashlib
+import tempfile
+import asyncio
+import threading
+import atexit
+import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Dict, Any, Optional
-from contextlib import contextmanager
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from functools import lru_cache
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Tuple
+from contextlib import contextmanager, asynccontextmanager
+from fastapi import FastAPI, File, UploadFile, HTTPException, Query
 from fastapi.responses import JSONResponse
-import uvicorn
 
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, Boolean, DECIMAL, ForeignKey, Date
-from sqlalchemy.orm import DeclarativeBase, sessionmaker, Session, relationship
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy import create_engine, insert, update, bindparam, func, text, Column, Identity, BigInteger, Integer, String, Text, DateTime, Boolean, DECIMAL, REAL, ForeignKey, Date
+from sqlalchemy.orm import DeclarativeBase, sessionmaker, Session
+from sqlalchemy.dialects.postgresql import JSONB, insert as pg_insert
+from sqlalchemy.pool import NullPool
 import psycopg2
+import psycopg2.extras
 
-from openai import OpenAI
 from pydantic import ValidationError
+from pydantic_core import from_json, to_json
+
+if TYPE_CHECKING:
+    from openai import OpenAI
 
 from models.pricing import ContractExtraction, create_openai_response_format
 from config import config
 
+# Runs on import so uvicorn, gunicorn and scripts importing the app all log;
+# basicConfig leaves a root logger that is already configured untouched
+logging.basicConfig(level=config.log_level, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+logger = logging.getLogger(__name__)
+
+# Appended once after a schema failure so the retry is not an identical request
+SCHEMA_RETRY_MESSAGE = {
+    "role": "user",
+    "content": "Your previous response was not valid JSON matching the required schema. "
+               "Return only a single JSON object that conforms exactly to the schema."
+}
+
 
 class Base(DeclarativeBase):
     """SQLAlchemy declarative base for database models"""
@@ -44,7 +69,7 @@ class ContractExtractionDB(Base):
     __tablename__ = 'contract_extractions'
     __table_args__ = {'schema': 'pricing'}
     
-    id = Column(Integer, primary_key=True)
+    id = Column(BigInteger, Identity(always=True), primary_key=True)
     document_title = Column(String(500), nullable=False)
     contract_type = Column(String(100), nullable=False)
     effective_date = Column(Date)
@@ -69,7 +94,7 @@ class ContractExtractionDB(Base):
     primary_currency = Column(String(10))
     
     # Extraction quality metrics
-    overall_confidence = Column(DECIMAL(3,2))
+    overall_confidence = Column(REAL)
     redacted_fields_count = Column(Integer, default=0)
     processing_warnings_count = Column(Integer, default=0)
     model_used = Column(String(50))
@@ -84,17 +109,15 @@ class ContractExtractionDB(Base):
     source_file_path = Column(Text)
     source_file_name = Column(String(255))
     source_file_size = Column(Integer)
-    file_hash = Column(String(64))
+    file_hash = Column(String(64), unique=True)
     
     # Timestamps
     extracted_at = Column(DateTime, default=datetime.utcnow)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow)
     
-    # Relationships
-    parties = relationship("ContractPartyDB", back_populates="contract", cascade="all, delete-orphan")
-    fees = relationship("ContractFeeDB", back_populates="contract", cascade="all, delete-orphan")
-    pricing_rules = relationship("PricingRuleDB", back_populates="contract", cascade="all, delete-orphan")
+    # Child rows are written with Core inserts and removed by ON DELETE CASCADE,
+    # so no ORM relationships are mapped
 
 
 class ContractPartyDB(Base):
@@ -102,8 +125,8 @@ class ContractPartyDB(Base):
     __tablename__ = 'contract_parties'
     __table_args__ = {'schema': 'pricing'}
     
-    id = Column(Integer, primary_key=True)
-    contract_extraction_id = Column(Integer, ForeignKey('pricing.contract_extractions.id'))
+    id = Column(BigInteger, Identity(always=True), primary_key=True)
+    contract_extraction_id = Column(BigInteger, ForeignKey('pricing.contract_extractions.id', ondelete='CASCADE', deferrable=True, initially='DEFERRED'))
     entity_name = Column(String(300), nullable=False)
     entity_type = Column(String(100))
     role = Column(String(100))
@@ -111,8 +134,6 @@ class ContractPartyDB(Base):
     jurisdiction = Column(String(100))
     normalized_name = Column(String(300))
     created_at = Column(DateTime, default=datetime.utcnow)
-    
-    contract = relationship("ContractExtractionDB", back_populates="parties")
 
 
 class ContractFeeDB(Base):
@@ -120,10 +141,11 @@ class ContractFeeDB(Base):
     __tablename__ = 'contract_fees'
     __table_args__ = {'schema': 'pricing'}
     
-    id = Column(Integer, primary_key=True)
-    contract_extraction_id = Column(Integer, ForeignKey('pricing.contract_extractions.id'))
+    id = Column(BigInteger, Identity(always=True), primary_key=True)
+    contract_extraction_id = Column(BigInteger, ForeignKey('pricing.contract_extractions.id', ondelete='CASCADE', deferrable=True, initially='DEFERRED'))
     fee_description = Column(Text, nullable=False)
     fee_type = Column(String(100))
+    contract_type = Column(String(100))
     amount_value = Column(Text)
     amount_currency = Column(String(10))
     calculation_method = Column(Text)
@@ -137,11 +159,9 @@ class ContractFeeDB(Base):
     has_minimum = Column(Boolean, default=False)
     has_maximum = Column(Boolean, default=False)
     
-    confidence_score = Column(DECIMAL(3,2))
+    confidence_score = Column(REAL)
     is_redacted = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
-    
-    contract = relationship("ContractExtractionDB", back_populates="fees")
 
 
 class PricingRuleDB(Base):
@@ -149,13 +169,14 @@ class PricingRuleDB(Base):
     __tablename__ = 'pricing_rules'
     __table_args__ = {'schema': 'pricing'}
     
-    id = Column(Integer, primary_key=True)
-    contract_extraction_id = Column(Integer, ForeignKey('pricing.contract_extractions.id'))
-    applies_to_fee_id = Column(Integer, ForeignKey('pricing.contract_fees.id'))
+    id = Column(BigInteger, Identity(always=True), primary_key=True)
+    contract_extraction_id = Column(BigInteger, ForeignKey('pricing.contract_extractions.id', ondelete='CASCADE', deferrable=True, initially='DEFERRED'))
+    applies_to_fee_id = Column(BigInteger, ForeignKey('pricing.contract_fees.id', ondelete='SET NULL', deferrable=True, initially='DEFERRED'))
     
     rule_name = Column(String(200), nullable=False)
     rule_description = Column(Text)
     rule_type = Column(String(100))
+    contract_type = Column(String(100))
     triggers = Column(Text)
     calculation_summary = Column(Text)
     applies_to = Column(Text)
@@ -165,16 +186,60 @@ class PricingRuleDB(Base):
     requires_approval = Column(Boolean, default=False)
     priority = Column(Integer)
     created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class ExtractionJobDB(Base):
+    """Per-file processing status, used to track contracts submitted through the Batch API"""
+    __tablename__ = 'extraction_jobs'
+    __table_args__ = {'schema': 'pricing'}
+    
+    # The table is partitioned on created_at, which is therefore part of the key; it is
+    # set by the database so rows are routed by the same clock as the partitions
+    id = Column(BigInteger, Identity(always=True), primary_key=True)
+    created_at = Column(DateTime(timezone=True), primary_key=True, server_default=func.now())
+    contract_extraction_id = Column(BigInteger, ForeignKey('pricing.contract_extractions.id', ondelete='SET NULL', deferrable=True, initially='DEFERRED'))
+    
+    file_path = Column(Text, nullable=False)
+    file_name = Column(String(255), nullable=False)
+    file_size = Column(BigInteger)
+    file_hash = Column(String(64))
     
-    contract = relationship("ContractExtractionDB", back_populates="pricing_rules")
+    processing_status = Column(String(50), default='pending')
+    processing_started_at = Column(DateTime)
+    processing_completed_at = Column(DateTime)
+    processing_error = Column(Text)
+    processing_time_seconds = Column(DECIMAL(10,3))
+    
+    openai_file_id = Column(String(100))
+    batch_id = Column(String(100))
+    model_used = Column(String(50))
+    retry_count = Column(Integer, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
 
 
 from urllib.parse import quote_plus
 
 DATABASE_URL = f"postgresql://{config.db_user}:{quote_plus(config.db_password)}@{config.db_host}:{config.db_port}/{config.db_name}"
-engine = create_engine(DATABASE_URL, pool_pre_ping=True, pool_recycle=300)
+ENGINE_OPTIONS = dict(
+    # Multi-row INSERT ... VALUES pages for executemany, and execute_batch for
+    # updates/deletes, instead of one statement per parameter set
+    executemany_mode='values_plus_batch',
+    insertmanyvalues_page_size=500,
+    executemany_batch_page_size=500,
+    # JSONB columns are encoded with pydantic-core's Rust serializer instead of json.dumps
+    json_serializer=lambda value: to_json(value).decode('utf-8')
+)
+
+if config.db_pgbouncer:
+    # PgBouncer already pools server connections, so open a client connection per checkout
+    engine = create_engine(DATABASE_URL, poolclass=NullPool, **ENGINE_OPTIONS)
+else:
+    engine = create_engine(DATABASE_URL, pool_pre_ping=True, pool_recycle=300, **ENGINE_OPTIONS)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# psycopg2 decodes JSONB results itself; parse them with pydantic-core as well
+psycopg2.extras.register_default_jsonb(globally=True, loads=from_json)
+
 
 @contextmanager
 def get_database_session():
@@ -189,6 +254,74 @@ def get_database_session():
         db.close()
 
 
+# contract_summary and fee_type_analysis are materialized views; a save schedules one
+# refresh analytics_refresh_seconds later, covering every save made in the meantime
+_analytics_refresh_lock = threading.Lock()
+_analytics_refresh_timer: Optional[threading.Timer] = None
+
+
+def schedule_analytics_refresh() -> None:
+    """Refresh the materialized analytics views shortly after contracts were stored"""
+    global _analytics_refresh_timer
+    with _analytics_refresh_lock:
+        if _analytics_refresh_timer is not None:
+            return
+        _analytics_refresh_timer = threading.Timer(config.analytics_refresh_seconds, refresh_analytics_views)
+        _analytics_refresh_timer.daemon = True
+        _analytics_refresh_timer.start()
+
+
+def refresh_analytics_views() -> None:
+    """Run pricing.refresh_analytics_views(); saves made while it runs schedule the next one"""
+    global _analytics_refresh_timer
+    with _analytics_refresh_lock:
+        _analytics_refresh_timer = None
+    try:
+        with engine.begin() as connection:
+            connection.execute(text("SELECT pricing.refresh_analytics_views()"))
+    except Exception as e:
+        logger.warning("Refreshing the analytics views failed: %s", e)
+
+
+# Child row sets at least this large are loaded with COPY instead of a multi-row INSERT
+COPY_THRESHOLD = 50
+
+
+def copy_rows(db: Session, model, rows: List[Dict[str, Any]]) -> None:
+    """Bulk-load rows into a model's table with COPY ... FROM STDIN in the session's transaction"""
+    columns = list(rows[0])
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter='\t', quoting=csv.QUOTE_MINIMAL, lineterminator='\n')
+    for row in rows:
+        writer.writerow([r'\N' if row[column] is None else row[column] for column in columns])
+    buffer.seek(0)
+    
+    copy_sql = (
+        f"COPY {model.__table__.fullname} ({', '.join(columns)}) "
+        f"FROM STDIN WITH (FORMAT csv, DELIMITER E'\\t', NULL '\\N')"
+    )
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(copy_sql, buffer)
+    finally:
+        cursor.close()
+
+
+def insert_child_rows(db: Session, model, rows: List[Dict[str, Any]]) -> None:
+    """Insert child rows, switching to COPY once the row count makes it worthwhile"""
+    if not rows:
+        return
+    if len(rows) >= COPY_THRESHOLD:
+        if config.db_trusted_ingest:
+            # Skips foreign key and trigger checks for the rest of this transaction;
+            # the rows reference a contract inserted in the same transaction
+            db.execute(text("SET LOCAL session_replication_role = replica"))
+        copy_rows(db, model, rows)
+    else:
+        # Core insert of plain dicts runs as one executemany, without ORM instances
+        db.execute(insert(model), rows)
+
+
 def calculate_file_hash(file_content: bytes) -> str:
     """Calculate SHA-256 hash of file content for deduplication"""
     return hashlib.sha256(file_content).hexdigest()
@@ -213,8 +346,133 @@ def safe_date_parse(date_string: str) -> Optional[datetime.date]:
             return None
 
 
-def analyze_financial_characteristics(financial_terms: dict) -> dict:
-    """Analyze financial terms to identify key characteristics for filtering"""
+def split_pdf(file_content: bytes, pages_per_chunk: int) -> Tuple[int, List[bytes]]:
+    """Split a PDF into chunks of pages_per_chunk pages; returns the page count and the chunks"""
+    # Imported here so deployments that never split PDFs do not need pypdf loaded
+    from pypdf import PdfReader, PdfWriter
+    
+    reader = PdfReader(io.BytesIO(file_content))
+    total_pages = len(reader.pages)
+    if pages_per_chunk <= 0 or total_pages <= pages_per_chunk:
+        return total_pages, [file_content]
+    
+    chunks = []
+    for start in range(0, total_pages, pages_per_chunk):
+        writer = PdfWriter()
+        for page in reader.pages[start:start + pages_per_chunk]:
+            writer.add_page(page)
+        buffer = io.BytesIO()
+        writer.write(buffer)
+        chunks.append(buffer.getvalue())
+    return total_pages, chunks
+
+
+def merge_extractions(chunks: List[ContractExtraction], total_pages: int) -> ContractExtraction:
+    """Combine per-chunk extractions of one contract into a single extraction"""
+    # Chunks are in page order, so the first non-empty value is the one from the front of the contract
+    def first_value(values):
+        return next((value for value in values if value), values[0])
+    
+    def unique_items(items, key):
+        # An item restated on several chunks (a table across a page break, a summary page) is
+        # kept once, where it first appears, taking the copy from the most confident chunk
+        merged = {}
+        confidence = {}
+        for chunk in chunks:
+            score = chunk.extraction_metadata.overall_confidence
+            for item in items(chunk):
+                item_key = key(item)
+                if item_key not in merged or score > confidence[item_key]:
+                    merged[item_key] = item
+                    confidence[item_key] = score
+        return list(merged.values())
+    
+    metadata = [chunk.contract_metadata for chunk in chunks]
+    
+    parties = unique_items(lambda c: c.contract_metadata.parties, lambda party: normalize_name(party.entity_name))
+    fees = unique_items(
+        lambda c: c.financial_terms.fees,
+        lambda fee: (
+            normalize_name(fee.fee_type), normalize_name(fee.description),
+            str(fee.amount.value).strip(), fee.amount.currency.strip().upper()
+        )
+    )
+    # Unnamed rules fall back to their description so they are not collapsed into one
+    rules = unique_items(
+        lambda c: c.pricing_rules.rules,
+        lambda rule: normalize_name(rule.rule_name) or normalize_name(rule.rule_description)
+    )
+    
+    contract_metadata = metadata[0].model_copy(update={
+        field: first_value([getattr(m, field) for m in metadata])
+        for field in ('document_title', 'contract_type', 'effective_date', 'end_date', 'governing_law', 'jurisdiction')
+    })
+    contract_metadata = contract_metadata.model_copy(update={
+        'parties': parties,
+        'total_pages': total_pages
+    })
+    
+    financial_terms = chunks[0].financial_terms.model_copy(update={
+        **{
+            field: [term for chunk in chunks for term in getattr(chunk.financial_terms, field)]
+            for field in ('base_compensation', 'royalties', 'equity_compensation', 'expenses')
+        },
+        'fees': fees
+    })
+    pricing_rules = chunks[0].pricing_rules.model_copy(update={'rules': rules})
+    
+    # The weakest chunk bounds the confidence of the whole contract
+    extraction_metadata = chunks[0].extraction_metadata.model_copy(update={
+        'overall_confidence': min(chunk.extraction_metadata.overall_confidence for chunk in chunks),
+        'redacted_fields_count': sum(chunk.extraction_metadata.redacted_fields_count for chunk in chunks),
+        'extraction_notes': "\n".join(
+            chunk.extraction_metadata.extraction_notes for chunk in chunks if chunk.extraction_metadata.extraction_notes
+        ),
+        'processing_warnings': [
+            warning for chunk in chunks for warning in chunk.extraction_metadata.processing_warnings
+        ]
+    })
+    
+    return ContractExtraction(
+        contract_metadata=contract_metadata,
+        financial_terms=financial_terms,
+        pricing_rules=pricing_rules,
+        extraction_metadata=extraction_metadata
+    )
+
+
+def _check_file(path: str, kind: str) -> None:
+    """Exit unless path is an existing regular file, using a single stat call"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        logger.error("%s not found: %s", kind, path)
+        sys.exit(1)
+    if not stat.S_ISREG(st.st_mode):
+        logger.error("%s is not a file: %s", kind, path)
+        sys.exit(1)
+
+
+# One alternation scans each field once for every keyword. The lookahead reports
+# overlapping hits ('assetier' has both 'asset' and 'tier'); 'tiered' wins over 'tier'
+FEE_KEYWORDS = re.compile(r'(?=(tiered|tier|asset|commission|%))', re.IGNORECASE)
+
+
+def classify_fee(fee: dict) -> Dict[str, bool]:
+    """Keyword flags for a fee, shared by the contract analysis and the fee rows"""
+    type_hits = {hit.lower() for hit in FEE_KEYWORDS.findall(fee.get('fee_type', ''))}
+    calculation_hits = {hit.lower() for hit in FEE_KEYWORDS.findall(fee.get('calculation_method', ''))}
+    
+    return {
+        'is_tiered': 'tiered' in type_hits or 'tier' in calculation_hits or 'tiered' in calculation_hits,
+        'is_percentage': '%' in calculation_hits,
+        'is_asset_based': 'asset' in type_hits or 'asset' in calculation_hits,
+        'is_commission': 'commission' in type_hits
+    }
+
+
+def analyze_financial_characteristics(financial_terms: dict) -> Tuple[dict, List[Dict[str, bool]]]:
+    """Analyze financial terms to identify key characteristics for filtering; also returns each fee's flags"""
     characteristics = {
         'has_tiered_structures': False,
         'has_commissions': False,
@@ -224,19 +482,20 @@ def analyze_financial_characteristics(financial_terms: dict) -> dict:
     }
     
     currencies = set()
+    fee_flags = []
     
     # Analyze fees for characteristics
     for fee in financial_terms.get('fees', []):
-        fee_type = fee.get('fee_type', '').lower()
-        calculation = fee.get('calculation_method', '').lower()
+        flags = classify_fee(fee)
+        fee_flags.append(flags)
         
-        if 'tiered' in fee_type or 'tier' in calculation or '%' in calculation:
+        if flags['is_tiered'] or flags['is_percentage']:
             characteristics['has_tiered_structures'] = True
         
-        if 'commission' in fee_type:
+        if flags['is_commission']:
             characteristics['has_commissions'] = True
             
-        if 'asset' in fee_type or 'asset' in calculation:
+        if flags['is_asset_based']:
             characteristics['has_asset_based_fees'] = True
             
         currency = fee.get('amount', {}).get('currency')
@@ -255,70 +514,160 @@ def analyze_financial_characteristics(financial_terms: dict) -> dict:
     if currencies:
         characteristics['primary_currency'] = list(currencies)[0]
     
-    return characteristics
+    return characteristics, fee_flags
+
+
+class RateLimiter:
+    """Token bucket over requests and tokens per minute, shared by all extraction threads"""
+    
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self.max_request_capacity = float(requests_per_minute)
+        self.max_token_capacity = float(tokens_per_minute)
+        self.available_request_capacity = self.max_request_capacity
+        self.available_token_capacity = self.max_token_capacity
+        self.last_update = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _replenish(self, now: float) -> None:
+        elapsed = now - self.last_update
+        self.last_update = now
+        if self.max_request_capacity:
+            self.available_request_capacity = min(
+                self.max_request_capacity,
+                self.available_request_capacity + elapsed * self.max_request_capacity / 60
+            )
+        if self.max_token_capacity:
+            self.available_token_capacity = min(
+                self.max_token_capacity,
+                self.available_token_capacity + elapsed * self.max_token_capacity / 60
+            )
+    
+    def acquire(self, tokens: int) -> None:
+        """Block until one request using about `tokens` tokens fits within the quota"""
+        if self.max_token_capacity:
+            # A single oversized request would otherwise wait forever
+            tokens = min(tokens, self.max_token_capacity)
+        while True:
+            with self._lock:
+                self._replenish(time.monotonic())
+                request_shortfall = 1 - self.available_request_capacity if self.max_request_capacity else 0
+                token_shortfall = tokens - self.available_token_capacity if self.max_token_capacity else 0
+                if request_shortfall <= 0 and token_shortfall <= 0:
+                    if self.max_request_capacity:
+                        self.available_request_capacity -= 1
+                    if self.max_token_capacity:
+                        self.available_token_capacity -= tokens
+                    return
+                wait = max(
+                    request_shortfall * 60 / self.max_request_capacity if request_shortfall > 0 else 0,
+                    token_shortfall * 60 / self.max_token_capacity if token_shortfall > 0 else 0
+                )
+            time.sleep(wait)
+
+
+openai_rate_limiter = RateLimiter(config.openai_requests_per_minute, config.openai_tokens_per_minute)
+
+
+@lru_cache(maxsize=8)
+def _read_prompt(prompt_path: str, mtime_ns: int) -> str:
+    """Read prompt file contents; cached per (path, mtime) so edits are picked up"""
+    # Text mode turns CRLF line endings into '\n' before the prompt reaches the model or a cache key
+    with open(prompt_path, 'r', encoding='utf-8') as f:
+        return f.read().strip()
 
 
 class ContractExtractor:
     """Main contract extraction service using OpenAI GPT-4o"""
     
+    _clients: Dict[str, "OpenAI"] = {}
+    _cleanup_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="openai-cleanup")
+    # Separate from the request pool so chunk calls cannot wait behind the requests that spawned them
+    _chunk_pool = ThreadPoolExecutor(max_workers=config.max_workers, thread_name_prefix="pdf-chunk")
+    
     def __init__(self, api_key: Optional[str] = None):
-        """Initialize extractor with OpenAI client"""
-        self.client = OpenAI(api_key=api_key or config.openai_api_key)
+        """Initialize extractor; the shared OpenAI client is resolved on first use"""
+        self.api_key = api_key or config.openai_api_key
+        self._client = None
         self.model = config.openai_model
+        self.response_format = create_openai_response_format()
+    
+    @classmethod
+    def get_client(cls, api_key: str) -> "OpenAI":
+        """Return the process-wide OpenAI client for an API key, creating it on first use"""
+        client = cls._clients.get(api_key)
+        if client is None:
+            # Imported here so startup failures and non-OpenAI paths skip loading the SDK
+            from openai import OpenAI
+            client = cls._clients[api_key] = OpenAI(api_key=api_key)
+        return client
+    
+    @property
+    def client(self) -> "OpenAI":
+        if self._client is None:
+            self._client = self.get_client(self.api_key)
+        return self._client
         
-    def load_prompt(self, prompt_path: str) -> str:
-        """Load prompt file with error handling"""
+    def _safe_delete(self, file_id: str) -> None:
+        """Delete an uploaded OpenAI file, ignoring failures"""
         try:
-            with open(prompt_path, 'r', encoding='utf-8') as f:
-                return f.read().strip()
+            self.client.files.delete(file_id)
+        except Exception as e:
+            logger.debug("Could not delete OpenAI file %s: %s", file_id, e)
+    
+    @staticmethod
+    def load_prompt(prompt_path: str) -> str:
+        """Load prompt file with error handling, memoized on file modification time"""
+        try:
+            return _read_prompt(prompt_path, os.stat(prompt_path).st_mtime_ns)
         except FileNotFoundError:
             raise FileNotFoundError(f"Prompt file not found: {prompt_path}")
         except Exception as e:
             raise Exception(f"Error loading prompt from {prompt_path}: {e}")
     
-    def extract_from_file(self, 
-                         file_content: bytes,
-                         filename: str,
-                         max_retries: int = None) -> ContractExtraction:
-        """Extract financial terms from PDF file using OpenAI GPT-4o"""
-        
-        max_retries = max_retries or config.max_retries
-        
-        print(f"Starting extraction for: {filename}")
-        
-        # Load prompts
-        print("Loading prompts...")
-        system_prompt = self.load_prompt(config.system_prompt_path)
-        user_prompt = self.load_prompt(config.user_prompt_path)
-        
-        # Upload file to OpenAI
-        print("Uploading file to OpenAI...")
-        temp_path = None
+    @property
+    def prompts(self) -> Tuple[str, str]:
+        """System and user prompts; load_prompt re-reads a file only after it changes"""
+        return (
+            self.load_prompt(config.system_prompt_path),
+            self.load_prompt(config.user_prompt_path)
+        )
+    
+    def _cache_path(self, file_content: bytes, system_prompt: str, user_prompt: str) -> Optional[str]:
+        """Cache file for an extraction keyed by PDF bytes, prompts and model"""
+        if not config.cache_dir:
+            return None
+        digest = hashlib.sha256(file_content)
+        for part in (system_prompt, user_prompt, self.model):
+            digest.update(b'\0')
+            digest.update(part.encode('utf-8'))
+        return os.path.join(config.cache_dir, f"{digest.hexdigest()}.json")
+    
+    def _load_cached(self, cache_path: str) -> Optional[ContractExtraction]:
+        """Load a cached extraction, treating unreadable entries as misses"""
         try:
-            if not filename.lower().endswith('.pdf'):
-                raise Exception(f"File must have .pdf extension: {filename}")
-            
-            temp_dir = tempfile.mkdtemp()
-            temp_path = os.path.join(temp_dir, filename)
-            
-            with open(temp_path, 'wb') as f:
-                f.write(file_content)
-            
-            with open(temp_path, 'rb') as f:
-                file_response = self.client.files.create(
-                    file=f,
-                    purpose='assistants'
-                )
-            
-        finally:
-            if temp_path and os.path.exists(temp_path):
-                shutil.rmtree(os.path.dirname(temp_path))
-        
-        file_id = file_response.id
-        response_format = create_openai_response_format()
-        
-        # Prepare messages for GPT-4o
-        messages = [
+            with open(cache_path, 'rb') as f:
+                return ContractExtraction.model_validate_json(f.read())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValidationError) as e:
+            logger.warning("Ignoring unreadable cache entry %s: %s", cache_path, e)
+            return None
+    
+    def _store_cached(self, cache_path: str, extraction: ContractExtraction) -> None:
+        """Write an extraction to the cache atomically; failures only cost a future miss"""
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(cache_path), suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(to_json(extraction))
+            os.replace(temp_path, cache_path)
+        except OSError as e:
+            logger.warning("Could not write cache entry %s: %s", cache_path, e)
+    
+    @staticmethod
+    def build_messages(system_prompt: str, user_prompt: str, file_id: str) -> List[Dict[str, Any]]:
+        """Chat messages asking GPT-4o to extract the uploaded contract file"""
+        return [
             {
                 "role": "system", 
                 "content": system_prompt
@@ -339,206 +688,688 @@ class ContractExtractor:
                 ]
             }
         ]
+    
+    def extract_from_file(self, 
+                         file_content: bytes,
+                         filename: str,
+                         max_retries: int = None) -> ContractExtraction:
+        """Extract financial terms from PDF file using OpenAI GPT-4o"""
         
-        # Call OpenAI with retries
-        for attempt in range(max_retries):
-            try:
-                print(f"Calling OpenAI GPT-4o (attempt {attempt + 1}/{max_retries})...")
-                
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=messages,
-                    response_format=response_format,
-                    temperature=0.1,
-                    max_tokens=8192
-                )
-                
-                content = response.choices[0].message.content
-                
-                if not content:
-                    raise Exception("Empty response from OpenAI")
-                
-                # Parse and validate response
-                extraction_data = json.loads(content)
-                extraction = ContractExtraction(**extraction_data)
-                
-                print("Extraction completed successfully!")
-                
-                # Cleanup OpenAI file
+        from openai import APIConnectionError, RateLimitError, InternalServerError
+        
+        max_retries = max_retries or config.max_retries
+        
+        logger.info("Starting extraction for: %s", filename)
+        
+        # Load prompts
+        logger.debug("Loading prompts...")
+        system_prompt, user_prompt = self.prompts
+        
+        # Same PDF, prompts and model give the same extraction; reuse it from disk
+        cache_path = self._cache_path(file_content, system_prompt, user_prompt)
+        if cache_path:
+            cached = self._load_cached(cache_path)
+            if cached is not None:
+                logger.info("Using cached extraction for: %s", filename)
+                return cached
+        
+        # Upload file to OpenAI straight from memory; the SDK takes the
+        # filename from the buffer's name attribute
+        logger.debug("Uploading file to OpenAI...")
+        if not filename.lower().endswith('.pdf'):
+            raise Exception(f"File must have .pdf extension: {filename}")
+        
+        upload = io.BytesIO(file_content)
+        upload.name = filename
+        file_response = self.client.files.create(
+            file=upload,
+            purpose='assistants'
+        )
+        
+        file_id = file_response.id
+        
+        # Prepare messages for GPT-4o
+        messages = self.build_messages(system_prompt, user_prompt, file_id)
+        
+        # Rough token budget per call: prompt text at ~4 characters per token
+        # plus the completion ceiling
+        estimated_tokens = (len(system_prompt) + len(user_prompt)) // 4 + 8192
+        
+        # Call OpenAI with retries: transient API failures back off exponentially,
+        # schema failures retry with a correction nudge, anything else fails fast
+        try:
+            for attempt in range(max_retries):
                 try:
-                    self.client.files.delete(file_id)
-                except:
-                    pass
+                    logger.debug("Calling OpenAI GPT-4o (attempt %d/%d)...", attempt + 1, max_retries)
                     
-                return extraction
-                
-            except json.JSONDecodeError as e:
-                print(f"JSON parsing error (attempt {attempt + 1}): {e}")
-                if attempt == max_retries - 1:
-                    raise Exception(f"Failed to parse OpenAI response as JSON after {max_retries} attempts")
+                    # Wait for quota here rather than learning about it from a 429
+                    openai_rate_limiter.acquire(estimated_tokens)
                     
-            except ValidationError as e:
-                print(f"Schema validation error (attempt {attempt + 1}): {e}")
-                if attempt == max_retries - 1:
-                    raise Exception(f"OpenAI response doesn't match schema after {max_retries} attempts")
+                    response = self.client.chat.completions.create(
+                        model=self.model,
+                        messages=messages,
+                        response_format=self.response_format,
+                        temperature=0.1,
+                        max_tokens=8192
+                    )
                     
-            except Exception as e:
-                print(f"API error (attempt {attempt + 1}): {e}")
-                if attempt == max_retries - 1:
+                    content = response.choices[0].message.content
+                    
+                    # Parse and validate response in one pass; an empty or missing
+                    # body fails here as a ValidationError and is retried
+                    extraction = ContractExtraction.model_validate_json(content)
+                    
+                    logger.info("Extraction completed successfully for: %s", filename)
+                    if cache_path:
+                        self._store_cached(cache_path, extraction)
+                    return extraction
+                    
+                except ValidationError as e:
+                    logger.warning("Schema validation error (attempt %d): %s", attempt + 1, e)
+                    if attempt == max_retries - 1:
+                        raise Exception(f"OpenAI response doesn't match schema after {max_retries} attempts")
+                    if messages[-1] is not SCHEMA_RETRY_MESSAGE:
+                        messages.append(SCHEMA_RETRY_MESSAGE)
+                        
+                except (APIConnectionError, RateLimitError, InternalServerError) as e:
+                    logger.warning("API error (attempt %d): %s", attempt + 1, e)
+                    if attempt == max_retries - 1:
+                        raise Exception(f"API call failed after {max_retries} attempts: {e}")
+                    time.sleep(random.uniform(0, min(60, 2 * 2 ** attempt)))
+            
+            raise Exception("Extraction failed after all retry attempts")
+        
+        finally:
+            # Cleanup OpenAI file off the request path
+            self._cleanup_pool.submit(self._safe_delete, file_id)
+    
+    def extract_contract(self, file_content: bytes, filename: str) -> ContractExtraction:
+        """Extract a contract, sending long PDFs to OpenAI as page chunks in parallel"""
+        if config.chunk_pages <= 0:
+            return self.extract_from_file(file_content, filename)
+        
+        try:
+            total_pages, chunks = split_pdf(file_content, config.chunk_pages)
+        except Exception as e:
+            logger.warning("Could not split %s, extracting it whole: %s", filename, e)
+            return self.extract_from_file(file_content, filename)
+        
+        if len(chunks) == 1:
+            return self.extract_from_file(file_content, filename)
+        
+        logger.info("Extracting %s as %d chunks of up to %d pages", filename, len(chunks), config.chunk_pages)
+        stem = Path(filename).stem
+        futures = [
+            self._chunk_pool.submit(
+                self.extract_from_file,
+                chunk,
+                f"{stem}_pages_{index * config.chunk_pages + 1}-{min((index + 1) * config.chunk_pages, total_pages)}.pdf"
+            )
+            for index, chunk in enumerate(chunks)
+        ]
+        return merge_extractions([future.result() for future in futures], total_pages)
+        
+    def submit_batch(self, files: List[Tuple[bytes, str]]) -> Dict[str, Any]:
+        """Submit contracts to the OpenAI Batch API (half price, 24h window) for backfill runs"""
+        system_prompt, user_prompt = self.prompts
+        
+        lines = []
+        jobs = []
+        seen_hashes = set()
+        for file_content, filename in files:
+            file_hash = calculate_file_hash(file_content)
+            if file_hash in seen_hashes:
+                continue
+            seen_hashes.add(file_hash)
+            if self.find_by_hash(file_hash):
+                logger.info("Skipping %s, already extracted", filename)
+                continue
+            
+            upload = io.BytesIO(file_content)
+            upload.name = filename
+            file_id = self.client.files.create(file=upload, purpose='assistants').id
+            
+            # The custom_id carries what save_to_database needs once results arrive
+            lines.append(json.dumps({
+                "custom_id": f"{file_hash}:{len(file_content)}:{filename}",
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": self.model,
+                    "messages": self.build_messages(system_prompt, user_prompt, file_id),
+                    "response_format": self.response_format,
+                    "temperature": 0.1,
+                    "max_tokens": 8192
+                }
+            }))
+            jobs.append({
+                "file_path": filename,
+                "file_name": filename,
+                "file_size": len(file_content),
+                "file_hash": file_hash,
+                "openai_file_id": file_id,
+                "model_used": self.model
+            })
+        
+        if not lines:
+            return {"batch_id": None, "status": "skipped", "submitted": 0}
+        
+        batch_input = io.BytesIO("\n".join(lines).encode('utf-8'))
+        batch_input.name = "contract_extraction_batch.jsonl"
+        input_file = self.client.files.create(file=batch_input, purpose='batch')
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+        logger.info("Submitted batch %s with %d contracts", batch.id, len(lines))
+        self.record_batch_jobs(batch.id, jobs)
+        return {"batch_id": batch.id, "status": batch.status, "submitted": len(lines)}
+    
+    def record_batch_jobs(self, batch_id: str, jobs: List[Dict[str, Any]]) -> None:
+        """Track each contract of a submitted batch in extraction_jobs"""
+        jobs_table = ExtractionJobDB.__table__
+        try:
+            with get_database_session() as db:
+                db.execute(
+                    insert(jobs_table).values(
+                        batch_id=batch_id,
+                        processing_status='batch_submitted',
+                        processing_started_at=func.now()
+                    ),
+                    jobs
+                )
+                db.commit()
+        except Exception as e:
+            # The batch is already running; failing here would lose its ID
+            logger.warning("Could not record jobs for batch %s: %s", batch_id, e)
+    
+    def finish_batch_jobs(self, batch_id: str, outcomes: List[Dict[str, Any]], unanswered_error: str) -> None:
+        """Mark the tracked jobs of a batch completed or failed; jobs without an outcome fail with unanswered_error"""
+        jobs_table = ExtractionJobDB.__table__
+        finished = dict(
+            processing_completed_at=func.now(),
+            processing_time_seconds=func.extract('epoch', func.now() - jobs_table.c.processing_started_at),
+            updated_at=func.now()
+        )
+        # Errors propagate: the batch files are only deleted once its jobs are marked
+        with get_database_session() as db:
+            if outcomes:
+                db.execute(
+                    update(jobs_table)
+                    .where(jobs_table.c.batch_id == batch_id, jobs_table.c.file_hash == bindparam('job_hash'))
+                    .values(
+                        processing_status=bindparam('job_status'),
+                        contract_extraction_id=bindparam('job_contract_id'),
+                        processing_error=bindparam('job_error'),
+                        **finished
+                    ),
+                    outcomes
+                )
+            db.execute(
+                update(jobs_table)
+                .where(jobs_table.c.batch_id == batch_id, jobs_table.c.processing_status == 'batch_submitted')
+                .values(processing_status='failed', processing_error=unanswered_error, **finished)
+            )
+            db.commit()
+    
+    def collected_batch_results(self, batch_id: str, status: str) -> Optional[Dict[str, Any]]:
+        """Results of a batch whose jobs are all finished, read back from extraction_jobs"""
+        with get_database_session() as db:
+            jobs = db.query(
+                ExtractionJobDB.file_name,
+                ExtractionJobDB.processing_status,
+                ExtractionJobDB.contract_extraction_id,
+                ExtractionJobDB.processing_error
+            ).filter(ExtractionJobDB.batch_id == batch_id).all()
+        
+        if not jobs or any(job.processing_status == 'batch_submitted' for job in jobs):
+            return None
+        
+        results = []
+        errors = []
+        for job in jobs:
+            if job.processing_status == 'completed':
+                results.append({
+                    "filename": job.file_name,
+                    "status": "success",
+                    "database_id": job.contract_extraction_id,
+                    "output_path": extraction_output_path(job.contract_extraction_id, job.file_name)
+                })
+            else:
+                errors.append(f"{job.file_name}: {job.processing_error}")
+                results.append({"filename": job.file_name, "status": "error", "error": job.processing_error})
+        
+        return {
+            "batch_id": batch_id,
+            "status": status,
+            "successful": len(results) - len(errors),
+            "failed": len(errors),
+            "results": results,
+            "errors": errors
+        }
+    
+    def delete_batch_files(self, batch) -> None:
+        """Delete the uploaded PDFs and the input, output and error files of a finished batch"""
+        try:
+            # The uploaded PDFs are referenced from the batch input file
+            with self.client.files.with_streaming_response.content(batch.input_file_id) as batch_input:
+                for line in batch_input.iter_lines():
+                    if line:
+                        request = json.loads(line)
+                        file_part = request["body"]["messages"][1]["content"][1]
+                        self._cleanup_pool.submit(self._safe_delete, file_part["file"]["file_id"])
+        except Exception as e:
+            logger.warning("Could not read the input file of batch %s to delete its PDFs: %s", batch.id, e)
+        
+        for file_id in (batch.input_file_id, batch.output_file_id, batch.error_file_id):
+            if file_id:
+                self._cleanup_pool.submit(self._safe_delete, file_id)
+    
+    def collect_batch(self, batch_id: str) -> Dict[str, Any]:
+        """Store the results of a finished batch; returns the batch status while it is still running"""
+        batch = self.client.batches.retrieve(batch_id)
+        # Expired and cancelled batches still carry the results finished before they stopped
+        if batch.status not in ("completed", "failed", "expired", "cancelled"):
+            return {"batch_id": batch_id, "status": batch.status}
+        
+        # Polling again after collection answers from extraction_jobs instead of
+        # downloading and storing the output a second time
+        collected = self.collected_batch_results(batch_id, batch.status)
+        if collected is not None:
+            return collected
+        
+        results = []
+        errors = []
+        outcomes = []
+        if batch.output_file_id:
+            with self.client.files.with_streaming_response.content(batch.output_file_id) as output:
+                for line in output.iter_lines():
+                    if not line:
+                        continue
+                    record = json.loads(line)
+                    file_hash, file_size, filename = record["custom_id"].split(":", 2)
                     try:
-                        self.client.files.delete(file_id)
-                    except:
-                        pass
-                    raise Exception(f"API call failed after {max_retries} attempts: {e}")
+                        response = record.get("response") or {}
+                        if response.get("status_code") != 200:
+                            raise Exception(record.get("error") or f"HTTP {response.get('status_code')}")
+                        content = response["body"]["choices"][0]["message"]["content"]
+                        extraction = ContractExtraction.model_validate_json(content)
+                        db_id = self.save_to_database(extraction, filename, file_hash, int(file_size))
+                        output_path = extraction_output_path(db_id, filename)
+                        self.save_results(extraction, output_path)
+                        results.append({
+                            "filename": filename,
+                            "status": "success",
+                            "database_id": db_id,
+                            "output_path": output_path
+                        })
+                        outcomes.append({"job_hash": file_hash, "job_status": "completed", "job_contract_id": db_id, "job_error": None})
+                    except Exception as e:
+                        errors.append(f"{filename}: {str(e)}")
+                        results.append({"filename": filename, "status": "error", "error": str(e)})
+                        outcomes.append({"job_hash": file_hash, "job_status": "failed", "job_contract_id": None, "job_error": str(e)})
+        
+        if batch.error_file_id:
+            with self.client.files.with_streaming_response.content(batch.error_file_id) as error_output:
+                for line in error_output.iter_lines():
+                    if line:
+                        record = json.loads(line)
+                        file_hash, _, filename = record["custom_id"].split(":", 2)
+                        errors.append(f"{filename}: {record.get('error')}")
+                        results.append({"filename": filename, "status": "error", "error": str(record.get('error'))})
+                        outcomes.append({"job_hash": file_hash, "job_status": "failed", "job_contract_id": None, "job_error": str(record.get('error'))})
         
-        raise Exception("Extraction failed after all retry attempts")
+        unanswered = "No result in batch output" if batch.status == "completed" else f"Batch {batch.status}"
+        self.finish_batch_jobs(batch_id, outcomes, unanswered)
         
+        # extraction_jobs also lists the contracts the batch never answered
+        collected = self.collected_batch_results(batch_id, batch.status)
+        if collected is not None:
+            self.delete_batch_files(batch)
+            return collected
+        
+        # Without tracked jobs a later poll can only collect again from the batch files,
+        # so they are kept; storing the same contracts twice is a no-op by file hash
+        logger.warning("Batch %s has no tracked jobs; keeping its files", batch_id)
+        return {
+            "batch_id": batch_id,
+            "status": batch.status,
+            "successful": len([r for r in results if r.get("status") == "success"]),
+            "failed": len(errors),
+            "results": results,
+            "errors": errors
+        }
+    
     def save_results(self, extraction: ContractExtraction, output_path: str) -> None:
         """Save extraction results to JSON file"""
         try:
-            output_data = extraction.model_dump()
-            
             os.makedirs(os.path.dirname(output_path), exist_ok=True)
             
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(output_data, f, indent=2, ensure_ascii=False)
+            # pydantic-core emits UTF-8 bytes; write them as-is rather than
+            # decoding to str and re-encoding through a text wrapper
+            with open(output_path, 'wb') as f:
+                f.write(to_json(extraction, indent=2))
                 
-            print(f"JSON results saved to: {output_path}")
+            logger.info("JSON results saved to: %s", output_path)
             
         except Exception as e:
             raise Exception(f"Error saving results to {output_path}: {e}")
     
-    def save_to_database(self, extraction: ContractExtraction, filename: str, file_content: bytes) -> int:
+    def find_by_hash(self, file_hash: str) -> Optional[Dict[str, Any]]:
+        """Look up a stored extraction of the same PDF so it is not sent to OpenAI again"""
+        with get_database_session() as db:
+            existing = db.query(ContractExtractionDB).filter(ContractExtractionDB.file_hash == file_hash).first()
+            if not existing:
+                return None
+            
+            extraction = ContractExtraction.model_validate({
+                "contract_metadata": existing.contract_metadata_json,
+                "financial_terms": existing.financial_terms_json,
+                "pricing_rules": existing.pricing_rules_json,
+                "extraction_metadata": existing.extraction_metadata_json
+            })
+            return {
+                "database_id": existing.id,
+                "source_file_name": existing.source_file_name,
+                "extraction": extraction
+            }
+    
+    def _add_contract(self, db: Session, extraction: ContractExtraction, filename: str,
+                      file_hash: str, file_size: int) -> Tuple[Optional[int], List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Insert the contract row and build its party, fee and rule rows without writing them
+        
+        Returns a None ID and no rows when a contract with the same file hash is already stored.
+        """
+        # Convert to dictionaries once; the sections are reused for the JSONB columns as-is
+        extraction_data = extraction.model_dump(mode='json')
+        metadata = extraction_data['contract_metadata']
+        financial_terms = extraction_data['financial_terms']
+        pricing_rules = extraction_data['pricing_rules']
+        extraction_metadata = extraction_data['extraction_metadata']
+        
+        # Analyze financial characteristics; the per-fee flags are reused for the fee rows
+        characteristics, fee_flags = analyze_financial_characteristics(financial_terms)
+        
+        # Parse dates safely
+        effective_date = safe_date_parse(metadata.get('effective_date'))
+        end_date = safe_date_parse(metadata.get('end_date'))
+        
+        # Create main contract record; a stored PDF with the same hash makes this a no-op
+        contract_row = dict(
+            document_title=metadata.get('document_title', ''),
+            contract_type=metadata.get('contract_type', ''),
+            effective_date=effective_date,
+            end_date=end_date,
+            total_pages=metadata.get('total_pages', 0),
+            governing_law=metadata.get('governing_law', ''),
+            jurisdiction=metadata.get('jurisdiction', ''),
+            
+            # Financial summary counts
+            total_base_compensation_count=len(financial_terms.get('base_compensation', [])),
+            total_fees_count=len(financial_terms.get('fees', [])),
+            total_royalties_count=len(financial_terms.get('royalties', [])),
+            total_equity_count=len(financial_terms.get('equity_compensation', [])),
+            total_expenses_count=len(financial_terms.get('expenses', [])),
+            total_pricing_rules_count=len(pricing_rules.get('rules', [])),
+            
+            # Financial characteristics
+            has_tiered_structures=characteristics['has_tiered_structures'],
+            has_commissions=characteristics['has_commissions'],
+            has_asset_based_fees=characteristics['has_asset_based_fees'],
+            multi_currency_flag=characteristics['multi_currency_flag'],
+            primary_currency=characteristics['primary_currency'],
+            
+            # Quality metrics
+            overall_confidence=extraction_metadata.get('overall_confidence', 0.0),
+            redacted_fields_count=extraction_metadata.get('redacted_fields_count', 0),
+            processing_warnings_count=len(extraction_metadata.get('processing_warnings', [])),
+            model_used=extraction_metadata.get('model_used', ''),
+            
+            # Full JSON preservation
+            contract_metadata_json=metadata,
+            financial_terms_json=financial_terms,
+            pricing_rules_json=pricing_rules,
+            extraction_metadata_json=extraction_metadata,
+            
+            # File information
+            source_file_name=filename,
+            source_file_size=file_size,
+            file_hash=file_hash
+        )
+        
+        contract_id = db.execute(
+            pg_insert(ContractExtractionDB)
+            .values(**contract_row)
+            .on_conflict_do_nothing(index_elements=['file_hash'])
+            .returning(ContractExtractionDB.id)
+        ).scalar()
+        if contract_id is None:
+            return None, [], [], []
+        
+        # Build child rows as plain dicts; large sets are bulk-loaded with COPY
+        party_rows = [
+            {
+                'contract_extraction_id': contract_id,
+                'entity_name': party.get('entity_name', ''),
+                'entity_type': party.get('entity_type', ''),
+                'role': party.get('role', ''),
+                'address': party.get('address', ''),
+                'jurisdiction': party.get('jurisdiction', ''),
+                'normalized_name': normalize_name(party.get('entity_name', ''))
+            }
+            for party in metadata.get('parties', [])
+        ]
+        
+        fee_rows = []
+        for fee, flags in zip(financial_terms.get('fees', []), fee_flags):
+            fee_rows.append({
+                'contract_extraction_id': contract_id,
+                'fee_description': fee.get('description', ''),
+                'fee_type': fee.get('fee_type', ''),
+                'contract_type': contract_row['contract_type'],
+                'amount_value': str(fee.get('amount', {}).get('value', '')),
+                'amount_currency': fee.get('amount', {}).get('currency', ''),
+                'calculation_method': fee.get('calculation_method', ''),
+                'frequency': fee.get('frequency', ''),
+                'applies_to': fee.get('applies_to', ''),
+                
+                # Analysis flags
+                'is_tiered': flags['is_tiered'],
+                'is_asset_based': flags['is_asset_based'],
+                'is_commission': flags['is_commission'],
+                'has_minimum': bool(fee.get('minimum_amount', {}).get('value')),
+                'has_maximum': bool(fee.get('maximum_amount', {}).get('value')),
+                'is_redacted': fee.get('amount', {}).get('is_redacted', False)
+            })
+        
+        rule_rows = [
+            {
+                'contract_extraction_id': contract_id,
+                'rule_name': rule.get('rule_name', ''),
+                'rule_description': rule.get('rule_description', ''),
+                'rule_type': rule.get('rule_type', ''),
+                'contract_type': contract_row['contract_type'],
+                'triggers': rule.get('triggers', ''),
+                'calculation_summary': rule.get('calculation', ''),
+                'applies_to': rule.get('applies_to', ''),
+                'effective_period': rule.get('effective_period', '')
+            }
+            for rule in pricing_rules.get('rules', [])
+        ]
+        
+        return contract_id, party_rows, fee_rows, rule_rows
+    
+    @staticmethod
+    def _stored_id(db: Session, file_hash: str) -> int:
+        """ID of the contract that won an ON CONFLICT race for this file hash"""
+        return db.query(ContractExtractionDB.id).filter(ContractExtractionDB.file_hash == file_hash).scalar()
+    
+    def save_to_database(self, extraction: ContractExtraction, filename: str, file_hash: str, file_size: int) -> int:
         """Save extraction results to PostgreSQL database"""
         
         with get_database_session() as db:
             try:
-                file_hash = calculate_file_hash(file_content)
-                file_size = len(file_content)
-                
-                # Convert to dictionaries for processing
-                metadata = extraction.contract_metadata.model_dump()
-                financial_terms = extraction.financial_terms.model_dump()
-                pricing_rules = extraction.pricing_rules.model_dump()
-                extraction_metadata = extraction.extraction_metadata.model_dump()
-                
-                # Analyze financial characteristics
-                characteristics = analyze_financial_characteristics(financial_terms)
-                
-                # Parse dates safely
-                effective_date = safe_date_parse(metadata.get('effective_date'))
-                end_date = safe_date_parse(metadata.get('end_date'))
-                
-                # Create main contract record
-                contract_db = ContractExtractionDB(
-                    document_title=metadata.get('document_title', ''),
-                    contract_type=metadata.get('contract_type', ''),
-                    effective_date=effective_date,
-                    end_date=end_date,
-                    total_pages=metadata.get('total_pages', 0),
-                    governing_law=metadata.get('governing_law', ''),
-                    jurisdiction=metadata.get('jurisdiction', ''),
-                    
-                    # Financial summary counts
-                    total_base_compensation_count=len(financial_terms.get('base_compensation', [])),
-                    total_fees_count=len(financial_terms.get('fees', [])),
-                    total_royalties_count=len(financial_terms.get('royalties', [])),
-                    total_equity_count=len(financial_terms.get('equity_compensation', [])),
-                    total_expenses_count=len(financial_terms.get('expenses', [])),
-                    total_pricing_rules_count=len(pricing_rules.get('rules', [])),
-                    
-                    # Financial characteristics
-                    has_tiered_structures=characteristics['has_tiered_structures'],
-                    has_commissions=characteristics['has_commissions'],
-                    has_asset_based_fees=characteristics['has_asset_based_fees'],
-                    multi_currency_flag=characteristics['multi_currency_flag'],
-                    primary_currency=characteristics['primary_currency'],
-                    
-                    # Quality metrics
-                    overall_confidence=extraction_metadata.get('overall_confidence', 0.0),
-                    redacted_fields_count=extraction_metadata.get('redacted_fields_count', 0),
-                    processing_warnings_count=len(extraction_metadata.get('processing_warnings', [])),
-                    model_used=extraction_metadata.get('model_used', ''),
-                    
-                    # Full JSON preservation
-                    contract_metadata_json=metadata,
-                    financial_terms_json=financial_terms,
-                    pricing_rules_json=pricing_rules,
-                    extraction_metadata_json=extraction_metadata,
-                    
-                    # File information
-                    source_file_name=filename,
-                    source_file_size=file_size,
-                    file_hash=file_hash
+                contract_id, party_rows, fee_rows, rule_rows = self._add_contract(
+                    db, extraction, filename, file_hash, file_size
                 )
+                if contract_id is None:
+                    # Another request stored the same PDF first; reuse its row
+                    existing_id = self._stored_id(db, file_hash)
+                    logger.info("Contract %s already stored with ID: %s", filename, existing_id)
+                    return existing_id
                 
-                db.add(contract_db)
-                db.flush()  # Get the ID
+                insert_child_rows(db, ContractPartyDB, party_rows)
+                insert_child_rows(db, ContractFeeDB, fee_rows)
+                insert_child_rows(db, PricingRuleDB, rule_rows)
                 
-                # Save contract parties
-                for party in metadata.get('parties', []):
-                    party_db = ContractPartyDB(
-                        contract_extraction_id=contract_db.id,
-                        entity_name=party.get('entity_name', ''),
-                        entity_type=party.get('entity_type', ''),
-                        role=party.get('role', ''),
-                        address=party.get('address', ''),
-                        jurisdiction=party.get('jurisdiction', ''),
-                        normalized_name=normalize_name(party.get('entity_name', ''))
-                    )
-                    db.add(party_db)
+                db.commit()
+                logger.info("Database save completed with ID: %s", contract_id)
+                schedule_analytics_refresh()
+                return contract_id
                 
-                # Save fee details
-                for fee in financial_terms.get('fees', []):
-                    fee_type = fee.get('fee_type', '').lower()
-                    calculation = fee.get('calculation_method', '').lower()
+            except Exception as e:
+                db.rollback()
+                raise Exception(f"Database save failed: {e}")
+    
+    def save_many_to_database(self, contracts: List[Tuple[ContractExtraction, str, str, int]]) -> List[Any]:
+        """Save several extractions in one transaction; returns an ID or the exception for each contract"""
+        outcomes: List[Any] = []
+        party_rows, fee_rows, rule_rows = [], [], []
+        
+        with get_database_session() as db:
+            try:
+                for extraction, filename, file_hash, file_size in contracts:
+                    # A savepoint per contract keeps one bad row from discarding the others
+                    try:
+                        with db.begin_nested():
+                            contract_id, parties, fees, rules = self._add_contract(
+                                db, extraction, filename, file_hash, file_size
+                            )
+                    except Exception as e:
+                        outcomes.append(Exception(f"Database save failed: {e}"))
+                        continue
                     
-                    fee_db = ContractFeeDB(
-                        contract_extraction_id=contract_db.id,
-                        fee_description=fee.get('description', ''),
-                        fee_type=fee.get('fee_type', ''),
-                        amount_value=str(fee.get('amount', {}).get('value', '')),
-                        amount_currency=fee.get('amount', {}).get('currency', ''),
-                        calculation_method=fee.get('calculation_method', ''),
-                        frequency=fee.get('frequency', ''),
-                        applies_to=fee.get('applies_to', ''),
-                        
-                        # Analysis flags
-                        is_tiered='tiered' in fee_type or 'tier' in calculation,
-                        is_asset_based='asset' in fee_type or 'asset' in calculation,
-                        is_commission='commission' in fee_type,
-                        has_minimum=bool(fee.get('minimum_amount', {}).get('value')),
-                        has_maximum=bool(fee.get('maximum_amount', {}).get('value')),
-                        is_redacted=fee.get('amount', {}).get('is_redacted', False)
-                    )
-                    db.add(fee_db)
+                    if contract_id is None:
+                        outcomes.append(self._stored_id(db, file_hash))
+                        continue
+                    
+                    outcomes.append(contract_id)
+                    party_rows.extend(parties)
+                    fee_rows.extend(fees)
+                    rule_rows.extend(rules)
                 
-                # Save pricing rules
-                for rule in pricing_rules.get('rules', []):
-                    rule_db = PricingRuleDB(
-                        contract_extraction_id=contract_db.id,
-                        rule_name=rule.get('rule_name', ''),
-                        rule_description=rule.get('rule_description', ''),
-                        rule_type=rule.get('rule_type', ''),
-                        triggers=rule.get('triggers', ''),
-                        calculation_summary=rule.get('calculation', ''),
-                        applies_to=rule.get('applies_to', ''),
-                        effective_period=rule.get('effective_period', '')
-                    )
-                    db.add(rule_db)
+                # Child rows of every contract go out together, followed by a single commit
+                insert_child_rows(db, ContractPartyDB, party_rows)
+                insert_child_rows(db, ContractFeeDB, fee_rows)
+                insert_child_rows(db, PricingRuleDB, rule_rows)
                 
                 db.commit()
-                print(f"Database save completed with ID: {contract_db.id}")
-                return contract_db.id
+                logger.info("Database save completed for %d contracts", len(contracts))
+                schedule_analytics_refresh()
+                return outcomes
                 
             except Exception as e:
                 db.rollback()
-                raise Exception(f"Database save failed: {e}")
+                logger.warning("Batched save of %d contracts failed, saving them one by one: %s", len(contracts), e)
+        
+        # Isolate the contract whose child rows broke the shared transaction
+        outcomes = []
+        for contract in contracts:
+            try:
+                outcomes.append(self.save_to_database(*contract))
+            except Exception as e:
+                outcomes.append(e)
+        return outcomes
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Read the prompts before serving so a missing file fails startup, not the first request"""
+    extractor.prompts
+    yield
 
 
 # Initialize FastAPI app and extractor
-app = FastAPI(title="Contract Financial Extraction API", version="1.0.0")
+app = FastAPI(title="Contract Financial Extraction API", version="1.0.0", lifespan=lifespan)
 extractor = ContractExtractor()
+extraction_pool = ThreadPoolExecutor(max_workers=config.max_workers, thread_name_prefix="extraction")
+atexit.register(ContractExtractor._cleanup_pool.shutdown, wait=True)
+atexit.register(ContractExtractor._chunk_pool.shutdown, wait=True)
+
+
+def extraction_output_path(db_id: int, filename: str) -> str:
+    """JSON output location for a stored extraction, prefixed with its database ID"""
+    return os.path.join(config.default_output_dir, f"{db_id}_{Path(filename).stem}_extraction.json")
+
+
+def extract_unless_stored(file_content: bytes, filename: str) -> Tuple[Optional[dict], Optional[ContractExtraction], str]:
+    """Return the stored result for a known PDF, or a fresh extraction; also returns the file hash"""
+    file_hash = calculate_file_hash(file_content)
+    
+    # The same PDF was extracted before; answer from the database without calling OpenAI
+    existing = extractor.find_by_hash(file_hash)
+    if existing:
+        return {
+            "filename": filename,
+            "status": "success",
+            "duplicate": True,
+            "database_id": existing["database_id"],
+            "output_path": extraction_output_path(existing["database_id"], existing["source_file_name"] or filename),
+            "extraction": existing["extraction"].model_dump()
+        }, None, file_hash
+    
+    return None, extractor.extract_contract(file_content, filename), file_hash
+
+
+def export_contract(extraction: ContractExtraction, filename: str, db_id: int) -> dict:
+    """Write the JSON file for a stored extraction and build its API result"""
+    output_path = extraction_output_path(db_id, filename)
+    extractor.save_results(extraction, output_path)
+    
+    return {
+        "filename": filename,
+        "status": "success",
+        "database_id": db_id,
+        "output_path": output_path,
+        "extraction": extraction.model_dump()
+    }
+
+
+def process_contract(file_content: bytes, filename: str) -> dict:
+    """Extract, store and export a single contract; runs on a worker thread"""
+    stored, extraction, file_hash = extract_unless_stored(file_content, filename)
+    if stored:
+        return stored
+    
+    # Save to database
+    db_id = extractor.save_to_database(extraction, filename, file_hash, len(file_content))
+    
+    # Save JSON file
+    return export_contract(extraction, filename, db_id)
+
+
+def store_contracts(contracts: List[Tuple[ContractExtraction, str, str, int]]) -> List[Any]:
+    """Save extractions in one transaction, then export each; runs on a worker thread"""
+    outcomes = []
+    for (extraction, filename, _, _), db_id in zip(contracts, extractor.save_many_to_database(contracts)):
+        if isinstance(db_id, Exception):
+            outcomes.append(db_id)
+            continue
+        try:
+            outcomes.append(export_contract(extraction, filename, db_id))
+        except Exception as e:
+            outcomes.append(e)
+    return outcomes
+
+
+def error_result(filename: str, error: Exception) -> dict:
+    """API result for a contract that failed"""
+    return {
+        "filename": filename,
+        "status": "error",
+        "error": str(error)
+    }
 
 
 @app.post("/extract/single")
@@ -550,25 +1381,10 @@ async def extract_single_contract(file: UploadFile = File(...)):
     try:
         file_content = await file.read()
         
-        # Extract using OpenAI
-        extraction = extractor.extract_from_file(file_content, file.filename)
-        
-        # Save to database first
-        db_id = extractor.save_to_database(extraction, file.filename, file_content)
-        
-        # Save JSON file with database ID in filename
-        filename_stem = Path(file.filename).stem
-        output_filename = f"{db_id}_{filename_stem}_extraction.json"
-        output_path = os.path.join(config.default_output_dir, output_filename)
-        extractor.save_results(extraction, output_path)
-        
-        return {
-            "status": "success",
-            "filename": file.filename,
-            "database_id": db_id,
-            "output_path": output_path,
-            "extraction": extraction.model_dump()
-        }
+        # Extraction and storage block on OpenAI and the database, so run them
+        # on the extraction pool and keep the event loop free for other requests
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(extraction_pool, process_contract, file_content, file.filename)
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Extraction failed: {str(e)}")
@@ -580,44 +1396,53 @@ async def extract_multiple_contracts(files: List[UploadFile] = File(...)):
     if not files:
         raise HTTPException(status_code=400, detail="No files provided")
     
-    results = []
     errors = []
     
+    # OpenAI calls are network bound, so run the contracts side by side on
+    # the extraction pool instead of one after another
+    loop = asyncio.get_running_loop()
+    pending = []
     for file in files:
         if not file.filename.lower().endswith('.pdf'):
             errors.append(f"{file.filename}: Only PDF files are supported")
             continue
-            
+        
+        file_content = await file.read()
+        pending.append((
+            file.filename,
+            len(file_content),
+            loop.run_in_executor(extraction_pool, extract_unless_stored, file_content, file.filename)
+        ))
+    
+    outcomes = await asyncio.gather(*(future for _, _, future in pending), return_exceptions=True)
+    
+    # New extractions are stored together in one transaction instead of a commit per file
+    results = [None] * len(pending)
+    to_store = []
+    positions = []
+    for index, ((filename, file_size, _), outcome) in enumerate(zip(pending, outcomes)):
+        if isinstance(outcome, Exception):
+            results[index] = outcome
+            continue
+        stored, extraction, file_hash = outcome
+        if stored:
+            results[index] = stored
+        else:
+            to_store.append((extraction, filename, file_hash, file_size))
+            positions.append(index)
+    
+    if to_store:
         try:
-            file_content = await file.read()
-            
-            # Extract using OpenAI
-            extraction = extractor.extract_from_file(file_content, file.filename)
-            
-            # Save to database
-            db_id = extractor.save_to_database(extraction, file.filename, file_content)
-            
-            # Save JSON file
-            filename_stem = Path(file.filename).stem
-            output_filename = f"{db_id}_{filename_stem}_extraction.json"
-            output_path = os.path.join(config.default_output_dir, output_filename)
-            extractor.save_results(extraction, output_path)
-            
-            results.append({
-                "filename": file.filename,
-                "status": "success",
-                "database_id": db_id,
-                "output_path": output_path,
-                "extraction": extraction.model_dump()
-            })
-            
+            stored_outcomes = await loop.run_in_executor(extraction_pool, store_contracts, to_store)
         except Exception as e:
-            errors.append(f"{file.filename}: {str(e)}")
-            results.append({
-                "filename": file.filename,
-                "status": "error",
-                "error": str(e)
-            })
+            stored_outcomes = [e] * len(to_store)
+        for index, outcome in zip(positions, stored_outcomes):
+            results[index] = outcome
+    
+    for index, ((filename, _, _), outcome) in enumerate(zip(pending, results)):
+        if isinstance(outcome, Exception):
+            errors.append(f"{filename}: {str(outcome)}")
+            results[index] = error_result(filename, outcome)
     
     return {
         "total_files": len(files),
@@ -628,12 +1453,48 @@ async def extract_multiple_contracts(files: List[UploadFile] = File(...)):
     }
 
 
+@app.post("/extract/batch")
+async def submit_extraction_batch(files: List[UploadFile] = File(...)):
+    """Queue PDF contracts on the OpenAI Batch API for non-interactive backfills"""
+    if not files:
+        raise HTTPException(status_code=400, detail="No files provided")
+    
+    contracts = []
+    errors = []
+    for file in files:
+        if not file.filename.lower().endswith('.pdf'):
+            errors.append(f"{file.filename}: Only PDF files are supported")
+            continue
+        contracts.append((await file.read(), file.filename))
+    
+    if not contracts:
+        raise HTTPException(status_code=400, detail="No PDF files provided")
+    
+    try:
+        loop = asyncio.get_running_loop()
+        batch = await loop.run_in_executor(extraction_pool, extractor.submit_batch, contracts)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Batch submission failed: {str(e)}")
+    
+    return {**batch, "errors": errors}
+
+
+@app.get("/extract/batch/{batch_id}")
+def get_extraction_batch(batch_id: str):
+    """Poll a submitted batch and store its extractions once it has completed"""
+    try:
+        return extractor.collect_batch(batch_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Batch collection failed: {str(e)}")
+
+
 @app.get("/health")
-async def health_check():
+def health_check():
     """Health check endpoint with database connectivity test"""
     try:
-        with get_database_session() as db:
-            db.execute("SELECT 1")
+        # A plain connection is enough for the probe; no ORM session needed
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
         return {
             "status": "healthy", 
             "service": "contract-extraction-api",
@@ -661,7 +1522,7 @@ async def get_config():
 
 
 @app.get("/extractions/{extraction_id}")
-async def get_extraction(extraction_id: int):
+def get_extraction(extraction_id: int):
     """Get specific extraction by database ID"""
     with get_database_session() as db:
         extraction = db.query(ContractExtractionDB).filter(ContractExtractionDB.id == extraction_id).first()
@@ -682,10 +1543,14 @@ async def get_extraction(extraction_id: int):
 
 
 @app.get("/extractions")
-async def list_extractions(limit: int = 10, offset: int = 0):
-    """List recent extractions with pagination"""
+def list_extractions(limit: int = Query(10, ge=1, le=100), before_id: Optional[int] = None):
+    """List recent extractions, newest first; pass next_before_id back as before_id for the next page"""
     with get_database_session() as db:
-        extractions = db.query(ContractExtractionDB).order_by(ContractExtractionDB.created_at.desc()).offset(offset).limit(limit).all()
+        # Keyset pagination on the primary key: each page is an index range scan, however deep
+        query = db.query(ContractExtractionDB)
+        if before_id is not None:
+            query = query.filter(ContractExtractionDB.id < before_id)
+        extractions = query.order_by(ContractExtractionDB.id.desc()).limit(limit).all()
         return {
             "extractions": [
                 {
@@ -697,20 +1562,26 @@ async def list_extractions(limit: int = 10, offset: int = 0):
                     "file_name": e.source_file_name
                 }
                 for e in extractions
-            ]
+            ],
+            "next_before_id": extractions[-1].id if extractions and len(extractions) == limit else None
         }
 
 
 if __name__ == "__main__":
     if not config.openai_api_key:
-        print("Error: OPENAI_API_KEY environment variable is required")
+        logger.error("OPENAI_API_KEY environment variable is required")
         sys.exit(1)
     
+    # Fail fast on missing prompts instead of on the first request
+    _check_file(config.system_prompt_path, "System prompt")
+    _check_file(config.user_prompt_path, "User prompt")
+    
     # Ensure output directory exists
     os.makedirs(config.default_output_dir, exist_ok=True)
     
-    print(f"Starting Contract Extraction API on port 8000")
-    print(f"Database: {config.db_host}:{config.db_port}/{config.db_name}")
-    print(f"Output directory: {config.default_output_dir}")
+    logger.info("Starting Contract Extraction API on port 8000")
+    logger.info("Database: %s:%s/%s", config.db_host, config.db_port, config.db_name)
+    logger.info("Output directory: %s", config.default_output_dir)
     
+    import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
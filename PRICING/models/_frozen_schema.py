@@ -0,0 +1,567 @@
+# Generated by scripts/freeze_schema.py from models/pricing.py; do not edit by hand.
+# Strict OpenAI response format for ContractExtraction, precomputed so no schema
+# generation or traversal runs at import time.
+
+RESPONSE_FORMAT = {
+    'type': 'json_schema',
+    'json_schema': {
+        'name': 'contract_extraction',
+        'schema': {
+            '$defs': {
+                'BaseCompensation': {
+                    'properties': {
+                        'description': {
+                            'title': 'Description',
+                            'type': 'string'
+                        },
+                        'amount': {
+                            '$ref': '#/$defs/MonetaryAmount'
+                        },
+                        'payment_type': {
+                            'title': 'Payment Type',
+                            'type': 'string'
+                        },
+                        'frequency': {
+                            'title': 'Frequency',
+                            'type': 'string'
+                        },
+                        'calculation_method': {
+                            'title': 'Calculation Method',
+                            'type': 'string'
+                        },
+                        'conditions': {
+                            'title': 'Conditions',
+                            'type': 'string'
+                        },
+                        'payment_timing': {
+                            '$ref': '#/$defs/PaymentTiming'
+                        }
+                    },
+                    'required': [
+                        'description',
+                        'amount',
+                        'payment_type',
+                        'frequency',
+                        'calculation_method',
+                        'conditions',
+                        'payment_timing'
+                    ],
+                    'title': 'BaseCompensation',
+                    'type': 'object',
+                    'additionalProperties': False
+                },
+                'ContractMetadata': {
+                    'properties': {
+                        'document_title': {
+                            'title': 'Document Title',
+                            'type': 'string'
+                        },
+                        'contract_type': {
+                            'title': 'Contract Type',
+                            'type': 'string'
+                        },
+                        'effective_date': {
+                            'title': 'Effective Date',
+                            'type': 'string'
+                        },
+                        'end_date': {
+                            'title': 'End Date',
+                            'type': 'string'
+                        },
+                        'parties': {
+                            'items': {
+                                '$ref': '#/$defs/ContractParty'
+                            },
+                            'title': 'Parties',
+                            'type': 'array'
+                        },
+                        'total_pages': {
+                            'title': 'Total Pages',
+                            'type': 'integer'
+                        },
+                        'governing_law': {
+                            'title': 'Governing Law',
+                            'type': 'string'
+                        },
+                        'jurisdiction': {
+                            'title': 'Jurisdiction',
+                            'type': 'string'
+                        }
+                    },
+                    'required': [
+                        'document_title',
+                        'contract_type',
+                        'effective_date',
+                        'end_date',
+                        'parties',
+                        'total_pages',
+                        'governing_law',
+                        'jurisdiction'
+                    ],
+                    'title': 'ContractMetadata',
+                    'type': 'object',
+                    'additionalProperties': False
+                },
+                'ContractParty': {
+                    'properties': {
+                        'entity_name': {
+                            'title': 'Entity Name',
+                            'type': 'string'
+                        },
+                        'entity_type': {
+                            'title': 'Entity Type',
+                            'type': 'string'
+                        },
+                        'role': {
+                            'title': 'Role',
+                            'type': 'string'
+                        },
+                        'address': {
+                            'title': 'Address',
+                            'type': 'string'
+                        },
+                        'jurisdiction': {
+                            'title': 'Jurisdiction',
+                            'type': 'string'
+                        }
+                    },
+                    'required': [
+                        'entity_name',
+                        'entity_type',
+                        'role',
+                        'address',
+                        'jurisdiction'
+                    ],
+                    'title': 'ContractParty',
+                    'type': 'object',
+                    'additionalProperties': False
+                },
+                'EquityTerm': {
+                    'properties': {
+                        'description': {
+                            'title': 'Description',
+                            'type': 'string'
+                        },
+                        'instrument_type': {
+                            'title': 'Instrument Type',
+                            'type': 'string'
+                        },
+                        'quantity': {
+                            'anyOf': [
+                                {
+                                    'type': 'integer'
+                                },
+                                {
+                                    'type': 'string'
+                                }
+                            ],
+                            'title': 'Quantity'
+                        },
+                        'share_price': {
+                            'anyOf': [
+                                {
+                                    'type': 'number'
+                                },
+                                {
+                                    'type': 'string'
+                                }
+                            ],
+                            'title': 'Share Price'
+                        },
+                        'vesting_terms': {
+                            'title': 'Vesting Terms',
+                            'type': 'string'
+                        },
+                        'conversion_rights': {
+                            'title': 'Conversion Rights',
+                            'type': 'string'
+                        }
+                    },
+                    'required': [
+                        'description',
+                        'instrument_type',
+                        'quantity',
+                        'share_price',
+                        'vesting_terms',
+                        'conversion_rights'
+                    ],
+                    'title': 'EquityTerm',
+                    'type': 'object',
+                    'additionalProperties': False
+                },
+                'ExpenseTerm': {
+                    'properties': {
+                        'category': {
+                            'title': 'Category',
+                            'type': 'string'
+                        },
+                        'coverage': {
+                            'title': 'Coverage',
+                            'type': 'string'
+                        },
+                        'amount_limit': {
+                            '$ref': '#/$defs/MonetaryAmount'
+                        },
+                        'approval_required': {
+                            'title': 'Approval Required',
+                            'type': 'boolean'
+                        },
+                        'reimbursement_terms': {
+                            'title': 'Reimbursement Terms',
+                            'type': 'string'
+                        }
+                    },
+                    'required': [
+                        'category',
+                        'coverage',
+                        'amount_limit',
+                        'approval_required',
+                        'reimbursement_terms'
+                    ],
+                    'title': 'ExpenseTerm',
+                    'type': 'object',
+                    'additionalProperties': False
+                },
+                'ExtractionMetadata': {
+                    'properties': {
+                        'extraction_timestamp': {
+                            'title': 'Extraction Timestamp',
+                            'type': 'string'
+                        },
+                        'model_used': {
+                            'title': 'Model Used',
+                            'type': 'string'
+                        },
+                        'overall_confidence': {
+                            'title': 'Overall Confidence',
+                            'type': 'number'
+                        },
+                        'redacted_fields_count': {
+                            'title': 'Redacted Fields Count',
+                            'type': 'integer'
+                        },
+                        'extraction_notes': {
+                            'title': 'Extraction Notes',
+                            'type': 'string'
+                        },
+                        'processing_warnings': {
+                            'items': {
+                                'type': 'string'
+                            },
+                            'title': 'Processing Warnings',
+                            'type': 'array'
+                        }
+                    },
+                    'required': [
+                        'extraction_timestamp',
+                        'model_used',
+                        'overall_confidence',
+                        'redacted_fields_count',
+                        'extraction_notes',
+                        'processing_warnings'
+                    ],
+                    'title': 'ExtractionMetadata',
+                    'type': 'object',
+                    'additionalProperties': False
+                },
+                'FeeTerm': {
+                    'properties': {
+                        'description': {
+                            'title': 'Description',
+                            'type': 'string'
+                        },
+                        'fee_type': {
+                            'title': 'Fee Type',
+                            'type': 'string'
+                        },
+                        'amount': {
+                            '$ref': '#/$defs/MonetaryAmount'
+                        },
+                        'calculation_method': {
+                            'title': 'Calculation Method',
+                            'type': 'string'
+                        },
+                        'frequency': {
+                            'title': 'Frequency',
+                            'type': 'string'
+                        },
+                        'applies_to': {
+                            'title': 'Applies To',
+                            'type': 'string'
+                        },
+                        'minimum_amount': {
+                            '$ref': '#/$defs/MonetaryAmount'
+                        },
+                        'maximum_amount': {
+                            '$ref': '#/$defs/MonetaryAmount'
+                        }
+                    },
+                    'required': [
+                        'description',
+                        'fee_type',
+                        'amount',
+                        'calculation_method',
+                        'frequency',
+                        'applies_to',
+                        'minimum_amount',
+                        'maximum_amount'
+                    ],
+                    'title': 'FeeTerm',
+                    'type': 'object',
+                    'additionalProperties': False
+                },
+                'FinancialTerms': {
+                    'properties': {
+                        'base_compensation': {
+                            'items': {
+                                '$ref': '#/$defs/BaseCompensation'
+                            },
+                            'title': 'Base Compensation',
+                            'type': 'array'
+                        },
+                        'royalties': {
+                            'items': {
+                                '$ref': '#/$defs/RoyaltyTerm'
+                            },
+                            'title': 'Royalties',
+                            'type': 'array'
+                        },
+                        'fees': {
+                            'items': {
+                                '$ref': '#/$defs/FeeTerm'
+                            },
+                            'title': 'Fees',
+                            'type': 'array'
+                        },
+                        'equity_compensation': {
+                            'items': {
+                                '$ref': '#/$defs/EquityTerm'
+                            },
+                            'title': 'Equity Compensation',
+                            'type': 'array'
+                        },
+                        'expenses': {
+                            'items': {
+                                '$ref': '#/$defs/ExpenseTerm'
+                            },
+                            'title': 'Expenses',
+                            'type': 'array'
+                        }
+                    },
+                    'required': [
+                        'base_compensation',
+                        'royalties',
+                        'fees',
+                        'equity_compensation',
+                        'expenses'
+                    ],
+                    'title': 'FinancialTerms',
+                    'type': 'object',
+                    'additionalProperties': False
+                },
+                'MonetaryAmount': {
+                    'properties': {
+                        'value': {
+                            'anyOf': [
+                                {
+                                    'type': 'string'
+                                },
+                                {
+                                    'type': 'number'
+                                },
+                                {
+                                    'type': 'integer'
+                                }
+                            ],
+                            'title': 'Value'
+                        },
+                        'currency': {
+                            'title': 'Currency',
+                            'type': 'string'
+                        },
+                        'is_redacted': {
+                            'title': 'Is Redacted',
+                            'type': 'boolean'
+                        },
+                        'redaction_pattern': {
+                            'title': 'Redaction Pattern',
+                            'type': 'string'
+                        }
+                    },
+                    'required': [
+                        'value',
+                        'currency',
+                        'is_redacted',
+                        'redaction_pattern'
+                    ],
+                    'title': 'MonetaryAmount',
+                    'type': 'object',
+                    'additionalProperties': False
+                },
+                'PaymentTiming': {
+                    'properties': {
+                        'due_date': {
+                            'title': 'Due Date',
+                            'type': 'string'
+                        },
+                        'grace_period': {
+                            'title': 'Grace Period',
+                            'type': 'string'
+                        },
+                        'late_fees': {
+                            'title': 'Late Fees',
+                            'type': 'string'
+                        },
+                        'payment_method': {
+                            'title': 'Payment Method',
+                            'type': 'string'
+                        }
+                    },
+                    'required': [
+                        'due_date',
+                        'grace_period',
+                        'late_fees',
+                        'payment_method'
+                    ],
+                    'title': 'PaymentTiming',
+                    'type': 'object',
+                    'additionalProperties': False
+                },
+                'PricingRule': {
+                    'properties': {
+                        'rule_name': {
+                            'title': 'Rule Name',
+                            'type': 'string'
+                        },
+                        'rule_description': {
+                            'title': 'Rule Description',
+                            'type': 'string'
+                        },
+                        'rule_type': {
+                            'title': 'Rule Type',
+                            'type': 'string'
+                        },
+                        'triggers': {
+                            'title': 'Triggers',
+                            'type': 'string'
+                        },
+                        'calculation': {
+                            'title': 'Calculation',
+                            'type': 'string'
+                        },
+                        'applies_to': {
+                            'title': 'Applies To',
+                            'type': 'string'
+                        },
+                        'effective_period': {
+                            'title': 'Effective Period',
+                            'type': 'string'
+                        }
+                    },
+                    'required': [
+                        'rule_name',
+                        'rule_description',
+                        'rule_type',
+                        'triggers',
+                        'calculation',
+                        'applies_to',
+                        'effective_period'
+                    ],
+                    'title': 'PricingRule',
+                    'type': 'object',
+                    'additionalProperties': False
+                },
+                'PricingRules': {
+                    'properties': {
+                        'rules': {
+                            'items': {
+                                '$ref': '#/$defs/PricingRule'
+                            },
+                            'title': 'Rules',
+                            'type': 'array'
+                        }
+                    },
+                    'required': [
+                        'rules'
+                    ],
+                    'title': 'PricingRules',
+                    'type': 'object',
+                    'additionalProperties': False
+                },
+                'RoyaltyTerm': {
+                    'properties': {
+                        'description': {
+                            'title': 'Description',
+                            'type': 'string'
+                        },
+                        'rate': {
+                            'title': 'Rate',
+                            'type': 'string'
+                        },
+                        'calculation_base': {
+                            'title': 'Calculation Base',
+                            'type': 'string'
+                        },
+                        'minimum_amount': {
+                            'title': 'Minimum Amount',
+                            'type': 'string'
+                        },
+                        'maximum_amount': {
+                            'title': 'Maximum Amount',
+                            'type': 'string'
+                        },
+                        'product_scope': {
+                            'title': 'Product Scope',
+                            'type': 'string'
+                        },
+                        'territory': {
+                            'title': 'Territory',
+                            'type': 'string'
+                        },
+                        'special_terms': {
+                            'title': 'Special Terms',
+                            'type': 'string'
+                        }
+                    },
+                    'required': [
+                        'description',
+                        'rate',
+                        'calculation_base',
+                        'minimum_amount',
+                        'maximum_amount',
+                        'product_scope',
+                        'territory',
+                        'special_terms'
+                    ],
+                    'title': 'RoyaltyTerm',
+                    'type': 'object',
+                    'additionalProperties': False
+                }
+            },
+            'additionalProperties': False,
+            'properties': {
+                'contract_metadata': {
+                    '$ref': '#/$defs/ContractMetadata'
+                },
+                'financial_terms': {
+                    '$ref': '#/$defs/FinancialTerms'
+                },
+                'pricing_rules': {
+                    '$ref': '#/$defs/PricingRules'
+                },
+                'extraction_metadata': {
+                    '$ref': '#/$defs/ExtractionMetadata'
+                }
+            },
+            'required': [
+                'contract_metadata',
+                'financial_terms',
+                'pricing_rules',
+                'extraction_metadata'
+            ],
+            'title': 'ContractExtraction',
+            'type': 'object'
+        },
+        'strict': True
+    }
+}
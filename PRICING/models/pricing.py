@@ -1,17 +1,23 @@
 from datetime import datetime
+from functools import lru_cache
 from enum import Enum
 from typing import List, Union, Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 
-class MonetaryAmount(BaseModel):
+class FrozenModel(BaseModel):
+    # Extractions are read-only once parsed; unknown keys from the model are dropped
+    model_config = ConfigDict(frozen=True, extra='ignore', protected_namespaces=(), defer_build=True)
+
+
+class MonetaryAmount(FrozenModel):
     value: Union[str, float, int]
     currency: str
     is_redacted: bool
     redaction_pattern: str
 
 
-class ContractParty(BaseModel):
+class ContractParty(FrozenModel):
     entity_name: str
     entity_type: str
     role: str
@@ -19,14 +25,14 @@ class ContractParty(BaseModel):
     jurisdiction: str
     
 
-class PaymentTiming(BaseModel):
+class PaymentTiming(FrozenModel):
     due_date: str
     grace_period: str
     late_fees: str
     payment_method: str
 
 
-class ContractMetadata(BaseModel):
+class ContractMetadata(FrozenModel):
     document_title: str
     contract_type: str
     effective_date: str
@@ -37,7 +43,7 @@ class ContractMetadata(BaseModel):
     jurisdiction: str
 
 
-class BaseCompensation(BaseModel):
+class BaseCompensation(FrozenModel):
     description: str
     amount: MonetaryAmount
     payment_type: str
@@ -47,7 +53,7 @@ class BaseCompensation(BaseModel):
     payment_timing: PaymentTiming
 
 
-class RoyaltyTerm(BaseModel):
+class RoyaltyTerm(FrozenModel):
     description: str
     rate: str
     calculation_base: str
@@ -58,7 +64,7 @@ class RoyaltyTerm(BaseModel):
     special_terms: str
 
 
-class FeeTerm(BaseModel):
+class FeeTerm(FrozenModel):
     description: str
     fee_type: str
     amount: MonetaryAmount
@@ -69,7 +75,7 @@ class FeeTerm(BaseModel):
     maximum_amount: MonetaryAmount
 
 
-class EquityTerm(BaseModel):
+class EquityTerm(FrozenModel):
     description: str
     instrument_type: str
     quantity: Union[int, str]
@@ -78,7 +84,7 @@ class EquityTerm(BaseModel):
     conversion_rights: str
 
 
-class ExpenseTerm(BaseModel):
+class ExpenseTerm(FrozenModel):
     category: str
     coverage: str
     amount_limit: MonetaryAmount
@@ -86,7 +92,7 @@ class ExpenseTerm(BaseModel):
     reimbursement_terms: str
 
 
-class FinancialTerms(BaseModel):
+class FinancialTerms(FrozenModel):
     base_compensation: List[BaseCompensation]
     royalties: List[RoyaltyTerm]
     fees: List[FeeTerm]
@@ -94,7 +100,7 @@ class FinancialTerms(BaseModel):
     expenses: List[ExpenseTerm]
 
 
-class PricingRule(BaseModel):
+class PricingRule(FrozenModel):
     rule_name: str
     rule_description: str
     rule_type: str
@@ -104,11 +110,11 @@ class PricingRule(BaseModel):
     effective_period: str
 
 
-class PricingRules(BaseModel):
+class PricingRules(FrozenModel):
     rules: List[PricingRule]
 
 
-class ExtractionMetadata(BaseModel):
+class ExtractionMetadata(FrozenModel):
     extraction_timestamp: str
     model_used: str
     overall_confidence: float
@@ -117,34 +123,37 @@ class ExtractionMetadata(BaseModel):
     processing_warnings: List[str]
 
 
-class ContractExtraction(BaseModel):
+class ContractExtraction(FrozenModel):
     contract_metadata: ContractMetadata
     financial_terms: FinancialTerms
     pricing_rules: PricingRules
     extraction_metadata: ExtractionMetadata
     
-    class Config:
-        extra = "forbid"
+    # The top level stays strict so an unexpected section is reported, not silently dropped
+    model_config = ConfigDict(frozen=True, extra='forbid', protected_namespaces=(), defer_build=True)
 
 
+@lru_cache(maxsize=1)
 def get_json_schema() -> dict:
+    # Cached: the schema of a fixed model never changes at runtime; callers must not mutate it
     return ContractExtraction.model_json_schema()
 
 
-def create_openai_response_format() -> dict:
-    schema = get_json_schema()
+def _build_response_format() -> dict:
+    # Works on a freshly generated schema so the cached one above stays untouched;
+    # scripts/freeze_schema.py writes its result to models/_frozen_schema.py
+    schema = ContractExtraction.model_json_schema()
     
-    def add_additional_properties_false(obj):
-        if isinstance(obj, dict):
+    # Iterative walk; only containers are pushed, so leaves cost a single type check
+    stack = [schema]
+    while stack:
+        obj = stack.pop()
+        if type(obj) is dict:
             if obj.get("type") == "object":
                 obj["additionalProperties"] = False
-            for value in obj.values():
-                add_additional_properties_false(value)
-        elif isinstance(obj, list):
-            for item in obj:
-                add_additional_properties_false(item)
-    
-    add_additional_properties_false(schema)
+            stack.extend(value for value in obj.values() if type(value) in (dict, list))
+        else:
+            stack.extend(item for item in obj if type(item) in (dict, list))
     
     return {
         "type": "json_schema",
@@ -153,4 +162,16 @@ def create_openai_response_format() -> dict:
             "schema": schema,
             "strict": True
         }
-    }
\ No newline at end of file
+    }
+
+
+# Precomputed by scripts/freeze_schema.py; rebuilt here only if the generated module is missing
+try:
+    from ._frozen_schema import RESPONSE_FORMAT as _RESPONSE_FORMAT
+except ImportError:
+    _RESPONSE_FORMAT = _build_response_format()
+
+
+def create_openai_response_format() -> dict:
+    # Built once at import; the same dict is shared by every request
+    return _RESPONSE_FORMAT
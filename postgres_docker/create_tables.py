@@ -1,24 +1,29 @@
 #!/usr/bin/env python3
 
-import psycopg2
 from psycopg2.extras import RealDictCursor
+import re
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 sys.path.append(str(Path(__file__).parent.parent))
 from PRICING.config import config
+from postgres_docker.db import pooled_connection
 
 
 CREATE_SCHEMA_SQL = """
 -- Create pricing schema for our tables
 CREATE SCHEMA IF NOT EXISTS pricing;
 SET search_path TO pricing;
+
+-- GIN operator classes for plain scalar columns, used to key the JSONB indexes on contract_type
+CREATE EXTENSION IF NOT EXISTS btree_gin;
 """
 
 CREATE_TABLES_SQL = """
 -- Main contract extractions table
 CREATE TABLE IF NOT EXISTS contract_extractions (
-    id SERIAL PRIMARY KEY,
+    id BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
     
     -- Searchable metadata fields
     document_title VARCHAR(500) NOT NULL,
@@ -45,16 +50,16 @@ CREATE TABLE IF NOT EXISTS contract_extractions (
     primary_currency VARCHAR(10),
     
     -- Extraction quality metrics
-    overall_confidence DECIMAL(3,2) CHECK (overall_confidence >= 0 AND overall_confidence <= 1),
+    overall_confidence REAL CHECK (overall_confidence >= 0 AND overall_confidence <= 1),
     redacted_fields_count INTEGER DEFAULT 0,
     processing_warnings_count INTEGER DEFAULT 0,
     model_used VARCHAR(50),
     
     -- Full JSON data preservation
-    contract_metadata_json JSONB NOT NULL,
-    financial_terms_json JSONB NOT NULL,
-    pricing_rules_json JSONB NOT NULL,
-    extraction_metadata_json JSONB NOT NULL,
+    contract_metadata_json JSONB COMPRESSION lz4 NOT NULL,
+    financial_terms_json JSONB COMPRESSION lz4 NOT NULL,
+    pricing_rules_json JSONB COMPRESSION lz4 NOT NULL,
+    extraction_metadata_json JSONB COMPRESSION lz4 NOT NULL,
     
     -- File and processing info
     source_file_path TEXT,
@@ -68,10 +73,14 @@ CREATE TABLE IF NOT EXISTS contract_extractions (
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
+-- Child tables below get many rows per contract. Write them in batches, never one
+-- INSERT per row: the API (PRICING/extractor.py, insert_child_rows) uses COPY for
+-- large sets and multi-row INSERT ... VALUES pages for small ones.
+
 -- Contract parties (normalized for easy searching)
 CREATE TABLE IF NOT EXISTS contract_parties (
-    id SERIAL PRIMARY KEY,
-    contract_extraction_id INTEGER REFERENCES contract_extractions(id) ON DELETE CASCADE,
+    id BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    contract_extraction_id BIGINT REFERENCES contract_extractions(id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED,
     
     entity_name VARCHAR(300) NOT NULL,
     entity_type VARCHAR(100),
@@ -87,11 +96,13 @@ CREATE TABLE IF NOT EXISTS contract_parties (
 
 -- Contract fees (most frequently queried financial data)
 CREATE TABLE IF NOT EXISTS contract_fees (
-    id SERIAL PRIMARY KEY,
-    contract_extraction_id INTEGER REFERENCES contract_extractions(id) ON DELETE CASCADE,
+    id BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    contract_extraction_id BIGINT REFERENCES contract_extractions(id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED,
     
     fee_description TEXT NOT NULL,
     fee_type VARCHAR(100),
+    -- Copied from the parent contract so analytics can filter without a join
+    contract_type VARCHAR(100),
     amount_value TEXT,
     amount_currency VARCHAR(10),
     calculation_method TEXT,
@@ -106,7 +117,7 @@ CREATE TABLE IF NOT EXISTS contract_fees (
     has_maximum BOOLEAN DEFAULT FALSE,
     
     -- Quality metrics
-    confidence_score DECIMAL(3,2),
+    confidence_score REAL,
     is_redacted BOOLEAN DEFAULT FALSE,
     
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
@@ -114,13 +125,15 @@ CREATE TABLE IF NOT EXISTS contract_fees (
 
 -- Pricing rules (business logic implementation tracking)
 CREATE TABLE IF NOT EXISTS pricing_rules (
-    id SERIAL PRIMARY KEY,
-    contract_extraction_id INTEGER REFERENCES contract_extractions(id) ON DELETE CASCADE,
-    applies_to_fee_id INTEGER REFERENCES contract_fees(id) ON DELETE SET NULL,
+    id BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    contract_extraction_id BIGINT REFERENCES contract_extractions(id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED,
+    applies_to_fee_id BIGINT REFERENCES contract_fees(id) ON DELETE SET NULL DEFERRABLE INITIALLY DEFERRED,
     
     rule_name VARCHAR(200) NOT NULL,
     rule_description TEXT,
     rule_type VARCHAR(100),
+    -- Copied from the parent contract so analytics can filter without a join
+    contract_type VARCHAR(100),
     triggers TEXT,
     calculation_summary TEXT,
     applies_to TEXT,
@@ -134,17 +147,18 @@ CREATE TABLE IF NOT EXISTS pricing_rules (
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
--- File processing tracking
+-- File processing tracking, partitioned by month of created_at (see PARTITION_JOBS_SQL);
+-- the partition key has to be part of the primary key
 CREATE TABLE IF NOT EXISTS extraction_jobs (
-    id SERIAL PRIMARY KEY,
-    contract_extraction_id INTEGER REFERENCES contract_extractions(id) ON DELETE SET NULL,
+    id BIGINT GENERATED ALWAYS AS IDENTITY,
+    contract_extraction_id BIGINT REFERENCES contract_extractions(id) ON DELETE SET NULL DEFERRABLE INITIALLY DEFERRED,
     
     file_path TEXT NOT NULL,
     file_name VARCHAR(255) NOT NULL,
     file_size BIGINT,
     file_hash VARCHAR(64),
     
-    -- Processing status
+    -- Processing status: pending, batch_submitted (waiting on an OpenAI batch), completed or failed
     processing_status VARCHAR(50) DEFAULT 'pending',
     processing_started_at TIMESTAMP WITH TIME ZONE,
     processing_completed_at TIMESTAMP WITH TIME ZONE,
@@ -153,58 +167,331 @@ CREATE TABLE IF NOT EXISTS extraction_jobs (
     
     -- OpenAI tracking
     openai_file_id VARCHAR(100),
+    batch_id VARCHAR(100),
     model_used VARCHAR(50),
     retry_count INTEGER DEFAULT 0,
     
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
-);
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+"""
+
+# Databases created before extraction_jobs was partitioned: the plain table is set
+# aside here, before CREATE TABLE, and its rows are moved over by PARTITION_JOBS_SQL
+PREPARE_JOBS_PARTITIONING_SQL = """
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = 'pricing' AND c.relname = 'extraction_jobs' AND c.relkind = 'r'
+    ) THEN
+        DROP VIEW IF EXISTS pricing.recent_extractions, pricing.processing_stats;
+        ALTER TABLE pricing.extraction_jobs RENAME TO extraction_jobs_unpartitioned;
+        ALTER TABLE pricing.extraction_jobs_unpartitioned
+            RENAME CONSTRAINT extraction_jobs_pkey TO extraction_jobs_unpartitioned_pkey;
+        ALTER TABLE pricing.extraction_jobs_unpartitioned
+            RENAME CONSTRAINT extraction_jobs_contract_extraction_id_fkey TO extraction_jobs_unpartitioned_contract_extraction_id_fkey;
+        ALTER SEQUENCE IF EXISTS pricing.extraction_jobs_id_seq RENAME TO extraction_jobs_unpartitioned_id_seq;
+    END IF;
+END $$;
+"""
+
+MIGRATE_IDS_SQL = """
+-- Databases created when ids were SERIAL: convert every id and reference to a
+-- BIGINT identity in place. The views depend on these columns, so they are
+-- dropped here and recreated by CREATE_VIEWS_SQL. extraction_jobs is skipped:
+-- by now it has been recreated as a partitioned table with BIGINT ids.
+DO $$
+DECLARE
+    target TEXT;
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = 'pricing' AND table_name = 'contract_extractions'
+          AND column_name = 'id' AND data_type = 'integer'
+    ) THEN
+        DROP VIEW IF EXISTS pricing.recent_extractions, pricing.processing_stats,
+            pricing.contract_summary, pricing.fee_type_analysis, pricing.fee_type_analysis_by_contract_type;
+        
+        FOREACH target IN ARRAY ARRAY['contract_extractions', 'contract_parties', 'contract_fees', 'pricing_rules'] LOOP
+            EXECUTE format('ALTER TABLE pricing.%I ALTER COLUMN id DROP DEFAULT', target);
+            EXECUTE format('DROP SEQUENCE IF EXISTS pricing.%I', target || '_id_seq');
+            EXECUTE format('ALTER TABLE pricing.%I ALTER COLUMN id TYPE BIGINT', target);
+            EXECUTE format('ALTER TABLE pricing.%I ALTER COLUMN id ADD GENERATED ALWAYS AS IDENTITY', target);
+            EXECUTE format(
+                'SELECT setval(pg_get_serial_sequence(%L, ''id''), COALESCE(MAX(id), 0) + 1, false) FROM pricing.%I',
+                'pricing.' || target, target
+            );
+        END LOOP;
+        
+        ALTER TABLE pricing.contract_parties ALTER COLUMN contract_extraction_id TYPE BIGINT;
+        ALTER TABLE pricing.contract_fees ALTER COLUMN contract_extraction_id TYPE BIGINT;
+        ALTER TABLE pricing.pricing_rules ALTER COLUMN contract_extraction_id TYPE BIGINT;
+        ALTER TABLE pricing.pricing_rules ALTER COLUMN applies_to_fee_id TYPE BIGINT;
+    END IF;
+END $$;
 """
 
+PARTITION_JOBS_SQL = """
+-- Rows outside every monthly partition land here instead of failing the insert
+CREATE TABLE IF NOT EXISTS extraction_jobs_default PARTITION OF extraction_jobs DEFAULT;
+
+-- Monthly partitions from the current month up to months_ahead months out. Rows for
+-- a month without a partition sit in the default partition, and Postgres refuses to
+-- create that month's partition while they are there, so they are moved across with
+-- the default partition detached
+CREATE OR REPLACE FUNCTION create_extraction_jobs_partitions(months_ahead INTEGER DEFAULT 3) RETURNS void AS $$
+DECLARE
+    month_start DATE;
+    month_end DATE;
+    partition_name TEXT;
+BEGIN
+    FOR i IN 0..months_ahead LOOP
+        month_start := date_trunc('month', NOW())::date + make_interval(months => i);
+        month_end := month_start + INTERVAL '1 month';
+        partition_name := 'extraction_jobs_' || to_char(month_start, 'YYYY_MM');
+        CONTINUE WHEN to_regclass(format('pricing.%I', partition_name)) IS NOT NULL;
+        
+        IF EXISTS (
+            SELECT 1 FROM pricing.extraction_jobs_default
+            WHERE created_at >= month_start AND created_at < month_end
+        ) THEN
+            ALTER TABLE pricing.extraction_jobs DETACH PARTITION pricing.extraction_jobs_default;
+            EXECUTE format(
+                'CREATE TABLE pricing.%I PARTITION OF pricing.extraction_jobs FOR VALUES FROM (%L) TO (%L)',
+                partition_name, month_start, month_end
+            );
+            INSERT INTO pricing.extraction_jobs OVERRIDING SYSTEM VALUE
+            SELECT * FROM pricing.extraction_jobs_default
+            WHERE created_at >= month_start AND created_at < month_end;
+            DELETE FROM pricing.extraction_jobs_default
+            WHERE created_at >= month_start AND created_at < month_end;
+            ALTER TABLE pricing.extraction_jobs ATTACH PARTITION pricing.extraction_jobs_default DEFAULT;
+        ELSE
+            EXECUTE format(
+                'CREATE TABLE pricing.%I PARTITION OF pricing.extraction_jobs FOR VALUES FROM (%L) TO (%L)',
+                partition_name, month_start, month_end
+            );
+        END IF;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Every setup run adds the coming months; pg_cron, where installed, also runs it monthly.
+-- Without either, new rows still land in the default partition and are moved out later
+SELECT create_extraction_jobs_partitions();
+
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+        PERFORM cron.schedule('create-extraction-jobs-partitions', '0 0 1 * *',
+                              'SELECT pricing.create_extraction_jobs_partitions()');
+    END IF;
+END $$;
+
+-- Move the rows of a pre-partitioning extraction_jobs table set aside by
+-- PREPARE_JOBS_PARTITIONING_SQL, then drop it
+DO $$
+BEGIN
+    IF to_regclass('pricing.extraction_jobs_unpartitioned') IS NOT NULL THEN
+        INSERT INTO pricing.extraction_jobs (
+            id, contract_extraction_id, file_path, file_name, file_size, file_hash,
+            processing_status, processing_started_at, processing_completed_at, processing_error,
+            processing_time_seconds, openai_file_id, model_used, retry_count, created_at, updated_at
+        )
+        OVERRIDING SYSTEM VALUE
+        SELECT
+            id, contract_extraction_id, file_path, file_name, file_size, file_hash,
+            processing_status, processing_started_at, processing_completed_at, processing_error,
+            processing_time_seconds, openai_file_id, model_used, retry_count, COALESCE(created_at, NOW()), updated_at
+        FROM pricing.extraction_jobs_unpartitioned;
+        
+        PERFORM setval(pg_get_serial_sequence('pricing.extraction_jobs', 'id'),
+                       COALESCE(MAX(id), 0) + 1, false)
+        FROM pricing.extraction_jobs;
+        
+        DROP TABLE pricing.extraction_jobs_unpartitioned;
+    END IF;
+END $$;
+"""
+
+CREATE_TRIGGERS_SQL = """
+-- Columns added after the first release; CREATE TABLE IF NOT EXISTS skips existing tables
+ALTER TABLE contract_fees ADD COLUMN IF NOT EXISTS contract_type VARCHAR(100);
+ALTER TABLE pricing_rules ADD COLUMN IF NOT EXISTS contract_type VARCHAR(100);
+ALTER TABLE extraction_jobs ADD COLUMN IF NOT EXISTS batch_id VARCHAR(100);
+
+-- Foreign keys are checked at commit rather than per inserted row
+DO $$
+DECLARE
+    fk RECORD;
+BEGIN
+    FOR fk IN
+        SELECT c.conrelid::regclass AS table_name, c.conname
+        FROM pg_constraint c JOIN pg_namespace n ON n.oid = c.connamespace
+        WHERE n.nspname = 'pricing' AND c.contype = 'f' AND NOT c.condeferrable
+          AND c.conparentid = 0
+    LOOP
+        EXECUTE format('ALTER TABLE %s ALTER CONSTRAINT %I DEFERRABLE INITIALLY DEFERRED', fk.table_name, fk.conname);
+    END LOOP;
+END $$;
+
+-- Confidence scores used to be DECIMAL(3,2); the views reading them are dropped
+-- for the type change and recreated by CREATE_VIEWS_SQL
+DO $$
+DECLARE
+    dependent RECORD;
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = 'pricing' AND table_name = 'contract_extractions'
+          AND column_name = 'overall_confidence' AND data_type = 'numeric'
+    ) THEN
+        -- contract_summary and fee_type_analysis are plain views on databases set up
+        -- before they were materialized
+        FOR dependent IN
+            SELECT c.relname, c.relkind FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = 'pricing' AND c.relkind IN ('v', 'm')
+              AND c.relname IN ('contract_summary', 'fee_type_analysis', 'fee_type_analysis_by_contract_type', 'recent_extractions')
+        LOOP
+            EXECUTE format(
+                CASE dependent.relkind WHEN 'm' THEN 'DROP MATERIALIZED VIEW pricing.%I' ELSE 'DROP VIEW pricing.%I' END,
+                dependent.relname
+            );
+        END LOOP;
+        
+        ALTER TABLE contract_extractions ALTER COLUMN overall_confidence TYPE REAL;
+        ALTER TABLE contract_fees ALTER COLUMN confidence_score TYPE REAL;
+    END IF;
+END $$;
+
+-- LZ4 decompresses the TOASTed JSON documents faster than the default pglz;
+-- applies to values written from now on, existing rows keep pglz until rewritten
+ALTER TABLE contract_extractions
+    ALTER COLUMN contract_metadata_json SET COMPRESSION lz4,
+    ALTER COLUMN financial_terms_json SET COMPRESSION lz4,
+    ALTER COLUMN pricing_rules_json SET COMPRESSION lz4,
+    ALTER COLUMN extraction_metadata_json SET COMPRESSION lz4;
+
+-- The API writes contract_type itself; this fills it for any other writer
+CREATE OR REPLACE FUNCTION set_child_contract_type() RETURNS trigger AS $$
+BEGIN
+    IF NEW.contract_type IS NULL AND NEW.contract_extraction_id IS NOT NULL THEN
+        SELECT contract_type INTO NEW.contract_type
+        FROM pricing.contract_extractions
+        WHERE id = NEW.contract_extraction_id;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE TRIGGER contract_fees_contract_type
+    BEFORE INSERT ON contract_fees
+    FOR EACH ROW EXECUTE FUNCTION set_child_contract_type();
+
+CREATE OR REPLACE TRIGGER pricing_rules_contract_type
+    BEFORE INSERT ON pricing_rules
+    FOR EACH ROW EXECUTE FUNCTION set_child_contract_type();
+
+-- Backfill rows stored before the column existed
+UPDATE contract_fees f SET contract_type = ce.contract_type
+FROM contract_extractions ce
+WHERE f.contract_extraction_id = ce.id AND f.contract_type IS NULL AND ce.contract_type IS NOT NULL;
+
+UPDATE pricing_rules pr SET contract_type = ce.contract_type
+FROM contract_extractions ce
+WHERE pr.contract_extraction_id = ce.id AND pr.contract_type IS NULL AND ce.contract_type IS NOT NULL;
+"""
+
+# Built CONCURRENTLY so a populated database keeps taking writes; each statement
+# runs on its own autocommit connection (see build_indexes)
 CREATE_INDEXES_SQL = """
 -- Performance indexes for contract_extractions
-CREATE INDEX IF NOT EXISTS idx_contract_extractions_type ON contract_extractions(contract_type);
-CREATE INDEX IF NOT EXISTS idx_contract_extractions_dates ON contract_extractions(effective_date, end_date);
-CREATE INDEX IF NOT EXISTS idx_contract_extractions_confidence ON contract_extractions(overall_confidence);
-CREATE INDEX IF NOT EXISTS idx_contract_extractions_created ON contract_extractions(created_at);
-CREATE INDEX IF NOT EXISTS idx_contract_extractions_file_hash ON contract_extractions(file_hash);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_contract_extractions_type ON contract_extractions(contract_type);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_contract_extractions_dates ON contract_extractions(effective_date, end_date);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_contract_extractions_confidence ON contract_extractions(overall_confidence);
+-- Rows arrive in created_at order, so a BRIN min/max summary per block range
+-- replaces the per-row B-tree at a fraction of the size and insert cost
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_contract_extractions_created_brin ON contract_extractions USING BRIN (created_at) WITH (pages_per_range = 32);
+-- Unique so concurrent uploads of the same PDF cannot store it twice
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS idx_contract_extractions_file_hash_unique ON contract_extractions(file_hash);
 
 -- Financial flags for quick filtering
-CREATE INDEX IF NOT EXISTS idx_contract_extractions_tiered ON contract_extractions(has_tiered_structures);
-CREATE INDEX IF NOT EXISTS idx_contract_extractions_commissions ON contract_extractions(has_commissions);
-CREATE INDEX IF NOT EXISTS idx_contract_extractions_currency ON contract_extractions(primary_currency);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_contract_extractions_tiered ON contract_extractions(has_tiered_structures);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_contract_extractions_commissions ON contract_extractions(has_commissions);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_contract_extractions_currency ON contract_extractions(primary_currency);
 
 -- Party search indexes
-CREATE INDEX IF NOT EXISTS idx_contract_parties_name ON contract_parties(entity_name);
-CREATE INDEX IF NOT EXISTS idx_contract_parties_normalized ON contract_parties(normalized_name);
-CREATE INDEX IF NOT EXISTS idx_contract_parties_role ON contract_parties(role);
-CREATE INDEX IF NOT EXISTS idx_contract_parties_contract ON contract_parties(contract_extraction_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_contract_parties_name ON contract_parties(entity_name);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_contract_parties_normalized ON contract_parties(normalized_name);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_contract_parties_role ON contract_parties(role);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_contract_parties_contract ON contract_parties(contract_extraction_id);
 
 -- Fee analysis indexes
-CREATE INDEX IF NOT EXISTS idx_contract_fees_type ON contract_fees(fee_type);
-CREATE INDEX IF NOT EXISTS idx_contract_fees_currency ON contract_fees(amount_currency);
-CREATE INDEX IF NOT EXISTS idx_contract_fees_characteristics ON contract_fees(is_tiered, is_asset_based, is_commission);
-CREATE INDEX IF NOT EXISTS idx_contract_fees_contract ON contract_fees(contract_extraction_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_contract_fees_type ON contract_fees(fee_type);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_contract_fees_currency ON contract_fees(amount_currency);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_contract_fees_characteristics ON contract_fees(is_tiered, is_asset_based, is_commission);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_contract_fees_contract ON contract_fees(contract_extraction_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_contract_fees_contract_type ON contract_fees(contract_type, fee_type);
 
 -- Pricing rules indexes
-CREATE INDEX IF NOT EXISTS idx_pricing_rules_type ON pricing_rules(rule_type);
-CREATE INDEX IF NOT EXISTS idx_pricing_rules_contract ON pricing_rules(contract_extraction_id);
-CREATE INDEX IF NOT EXISTS idx_pricing_rules_fee ON pricing_rules(applies_to_fee_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_pricing_rules_type ON pricing_rules(rule_type);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_pricing_rules_contract ON pricing_rules(contract_extraction_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_pricing_rules_fee ON pricing_rules(applies_to_fee_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_pricing_rules_contract_type ON pricing_rules(contract_type, rule_type);
 
--- Job processing indexes
+-- Job processing indexes; a partitioned table cannot be indexed CONCURRENTLY,
+-- so these briefly lock extraction_jobs while each partition is indexed
 CREATE INDEX IF NOT EXISTS idx_extraction_jobs_hash ON extraction_jobs(file_hash);
 CREATE INDEX IF NOT EXISTS idx_extraction_jobs_status ON extraction_jobs(processing_status);
-CREATE INDEX IF NOT EXISTS idx_extraction_jobs_created ON extraction_jobs(created_at);
+CREATE INDEX IF NOT EXISTS idx_extraction_jobs_batch ON extraction_jobs(batch_id);
+CREATE INDEX IF NOT EXISTS idx_extraction_jobs_created_brin ON extraction_jobs USING BRIN (created_at) WITH (pages_per_range = 32);
 
 -- JSON indexes for complex queries
-CREATE INDEX IF NOT EXISTS idx_contract_extractions_metadata_gin ON contract_extractions USING GIN (contract_metadata_json);
-CREATE INDEX IF NOT EXISTS idx_contract_extractions_financial_gin ON contract_extractions USING GIN (financial_terms_json);
-CREATE INDEX IF NOT EXISTS idx_contract_extractions_pricing_gin ON contract_extractions USING GIN (pricing_rules_json);
+-- jsonb_path_ops supports only containment (@>, @?, @@) but is a fraction of the size
+-- of the default operator class. Key-existence (?, ?|, ?&) queries would need an expression index
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_contract_extractions_metadata_path_gin ON contract_extractions USING GIN (contract_metadata_json jsonb_path_ops);
+
+-- Analytical queries filter on contract_type first; leading the financial and pricing
+-- indexes with it lets the GIN scan intersect both conditions, and the JSONB column
+-- alone can still be searched through the same index
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_contract_extractions_type_financial_gin ON contract_extractions USING GIN (contract_type, financial_terms_json jsonb_path_ops);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_contract_extractions_type_pricing_gin ON contract_extractions USING GIN (contract_type, pricing_rules_json jsonb_path_ops);
+
+-- Materialized view keys, required by REFRESH MATERIALIZED VIEW CONCURRENTLY
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS idx_contract_summary_contract_type ON contract_summary(contract_type);
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS idx_fee_type_analysis_fee_type ON fee_type_analysis(fee_type);
 """
 
+# Indexes superseded by one in CREATE_INDEXES_SQL; each is dropped only once its
+# replacement has been built and is valid, so queries never go without either
+REPLACED_INDEXES = {
+    'idx_contract_extractions_created': 'idx_contract_extractions_created_brin',
+    'idx_contract_extractions_file_hash': 'idx_contract_extractions_file_hash_unique',
+    'idx_contract_extractions_metadata_gin': 'idx_contract_extractions_metadata_path_gin',
+    'idx_contract_extractions_financial_gin': 'idx_contract_extractions_type_financial_gin',
+    'idx_contract_extractions_pricing_gin': 'idx_contract_extractions_type_pricing_gin',
+    'idx_contract_extractions_financial_path_gin': 'idx_contract_extractions_type_financial_gin',
+    'idx_contract_extractions_pricing_path_gin': 'idx_contract_extractions_type_pricing_gin',
+}
+
 CREATE_VIEWS_SQL = """
--- Contract summary view for analytics
-CREATE OR REPLACE VIEW contract_summary AS
+-- The two dashboard aggregates are materialized; databases created before that
+-- still have them as plain views, which are dropped so they can be replaced
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_views WHERE schemaname = 'pricing' AND viewname = 'contract_summary') THEN
+        DROP VIEW pricing.contract_summary;
+    END IF;
+    IF EXISTS (SELECT 1 FROM pg_views WHERE schemaname = 'pricing' AND viewname = 'fee_type_analysis') THEN
+        DROP VIEW pricing.fee_type_analysis;
+    END IF;
+END $$;
+
+-- Contract summary view for analytics, refreshed by refresh_analytics_views()
+CREATE MATERIALIZED VIEW IF NOT EXISTS contract_summary AS
 SELECT 
     contract_type,
     COUNT(*) as total_contracts,
@@ -218,8 +505,8 @@ FROM contract_extractions
 GROUP BY contract_type
 ORDER BY total_contracts DESC;
 
--- Fee type analysis view
-CREATE OR REPLACE VIEW fee_type_analysis AS  
+-- Fee type analysis view, refreshed by refresh_analytics_views()
+CREATE MATERIALIZED VIEW IF NOT EXISTS fee_type_analysis AS
 SELECT 
     fee_type,
     COUNT(*) as frequency,
@@ -232,6 +519,40 @@ WHERE fee_type IS NOT NULL
 GROUP BY fee_type
 ORDER BY frequency DESC;
 
+-- CONCURRENTLY keeps the materialized views readable during a refresh; it needs
+-- the unique indexes built in CREATE_INDEXES_SQL
+CREATE OR REPLACE FUNCTION refresh_analytics_views() RETURNS void AS $$
+BEGIN
+    REFRESH MATERIALIZED VIEW CONCURRENTLY pricing.contract_summary;
+    REFRESH MATERIALIZED VIEW CONCURRENTLY pricing.fee_type_analysis;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Refresh every 5 minutes where pg_cron is installed; otherwise call
+-- SELECT pricing.refresh_analytics_views() from an external scheduler
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+        PERFORM cron.schedule('refresh-pricing-analytics', '*/5 * * * *',
+                              'SELECT pricing.refresh_analytics_views()');
+    END IF;
+END $$;
+
+-- Fee type analysis per contract type; filter with WHERE contract_type = ...
+-- to use idx_contract_fees_contract_type without joining contract_extractions
+CREATE OR REPLACE VIEW fee_type_analysis_by_contract_type AS
+SELECT 
+    contract_type,
+    fee_type,
+    COUNT(*) as frequency,
+    AVG(confidence_score) as avg_confidence,
+    COUNT(*) FILTER (WHERE is_tiered = true) as tiered_count,
+    COUNT(*) FILTER (WHERE is_asset_based = true) as asset_based_count,
+    COUNT(*) FILTER (WHERE is_commission = true) as commission_count
+FROM contract_fees
+WHERE fee_type IS NOT NULL
+GROUP BY contract_type, fee_type;
+
 -- Processing stats view
 CREATE OR REPLACE VIEW processing_stats AS
 SELECT 
@@ -268,6 +589,122 @@ GRANT ALL PRIVILEGES ON ALL SEQUENCES IN SCHEMA pricing TO insors_demo;
 GRANT SELECT ON ALL TABLES IN SCHEMA pricing TO insors_demo;
 """
 
+# Sent as one multi-statement batch so setup costs a single round-trip; indexes
+# are built afterwards because CREATE INDEX CONCURRENTLY cannot run in a transaction
+SCHEMA_SQL = "\n".join([
+    CREATE_SCHEMA_SQL,
+    PREPARE_JOBS_PARTITIONING_SQL,
+    CREATE_TABLES_SQL,
+    MIGRATE_IDS_SQL,
+    PARTITION_JOBS_SQL,
+    CREATE_TRIGGERS_SQL,
+    CREATE_VIEWS_SQL,
+    GRANT_PERMISSIONS_SQL
+])
+
+# Session settings for index builds; the GIN indexes on the JSONB columns are the
+# expensive ones, and B-tree builds can use parallel workers. maintenance_work_mem
+# applies per session, and up to INDEX_BUILD_WORKERS sessions build at once
+INDEX_SESSION_SQL = """
+SET search_path TO pricing;
+SET maintenance_work_mem = %(maintenance_work_mem)s;
+SET max_parallel_maintenance_workers = 4;
+"""
+
+INDEX_BUILD_WORKERS = 8
+
+
+def split_statements(sql):
+    """Split a DDL script into statements, dropping comment lines"""
+    # Comments go first so a semicolon inside one cannot split a statement
+    code = "\n".join(line for line in sql.splitlines() if not line.strip().startswith('--'))
+    return [statement.strip() for statement in code.split(';') if statement.strip()]
+
+
+def run_index_statements(connection_params, statements):
+    """Run index statements in order on a dedicated autocommit connection"""
+    with pooled_connection(connection_params, autocommit=True) as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(INDEX_SESSION_SQL, {'maintenance_work_mem': config.index_maintenance_work_mem})
+            for statement in statements:
+                cursor.execute(statement)
+
+
+def drop_invalid_indexes(connection_params):
+    """Drop indexes left INVALID by a failed concurrent build, which IF NOT EXISTS would skip"""
+    with pooled_connection(connection_params, autocommit=True) as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                SELECT c.relname
+                FROM pg_index i
+                JOIN pg_class c ON c.oid = i.indexrelid
+                JOIN pg_namespace n ON n.oid = c.relnamespace
+                WHERE n.nspname = 'pricing' AND NOT i.indisvalid AND c.relkind = 'i' AND NOT c.relispartition
+            """)
+            for (index_name,) in cursor.fetchall():
+                print(f"Dropping invalid index {index_name}")
+                cursor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS pricing."{index_name}"')
+
+
+def check_unique_file_hash(connection_params):
+    """Refuse to build the unique file_hash index over duplicate rows"""
+    with pooled_connection(connection_params) as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                SELECT COUNT(*) FROM (
+                    SELECT file_hash FROM pricing.contract_extractions
+                    WHERE file_hash IS NOT NULL
+                    GROUP BY file_hash HAVING COUNT(*) > 1
+                ) duplicates
+            """)
+            duplicates = cursor.fetchone()[0]
+        conn.rollback()
+    if duplicates:
+        raise Exception(
+            f"{duplicates} file hashes are stored more than once in contract_extractions; "
+            "remove the duplicate rows before the unique file_hash index can be built"
+        )
+
+
+def drop_replaced_indexes(connection_params):
+    """Drop superseded indexes whose replacement is now valid"""
+    with pooled_connection(connection_params, autocommit=True) as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                SELECT c.relname
+                FROM pg_index i
+                JOIN pg_class c ON c.oid = i.indexrelid
+                JOIN pg_namespace n ON n.oid = c.relnamespace
+                WHERE n.nspname = 'pricing' AND i.indisvalid AND c.relname = ANY(%s)
+            """, (list(set(REPLACED_INDEXES.values())),))
+            valid = {row[0] for row in cursor.fetchall()}
+            for old_index, new_index in REPLACED_INDEXES.items():
+                if new_index in valid:
+                    cursor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS pricing."{old_index}"')
+
+
+def build_indexes(connection_params):
+    """Build indexes concurrently, one connection per table in parallel"""
+    drop_invalid_indexes(connection_params)
+    check_unique_file_hash(connection_params)
+    
+    # Concurrent builds on the same table wait for each other, so statements are
+    # grouped per table and only different tables are built side by side
+    by_table = {}
+    for statement in split_statements(CREATE_INDEXES_SQL):
+        table = re.search(r'\bON\s+(\w+)', statement).group(1)
+        by_table.setdefault(table, []).append(statement)
+    
+    with ThreadPoolExecutor(max_workers=INDEX_BUILD_WORKERS) as pool:
+        futures = [
+            pool.submit(run_index_statements, connection_params, statements)
+            for statements in by_table.values()
+        ]
+        for future in futures:
+            future.result()
+    
+    drop_replaced_indexes(connection_params)
+
 
 def create_database_schema():
     """Create the complete database schema for contract extractions"""
@@ -282,49 +719,50 @@ def create_database_schema():
     
     try:
         print("Connecting to database...")
-        conn = psycopg2.connect(**connection_params)
-        conn.autocommit = True
         
-        with conn.cursor() as cursor:
-            print("Creating schema...")
-            cursor.execute(CREATE_SCHEMA_SQL)
-            
-            print("Creating tables...")
-            cursor.execute(CREATE_TABLES_SQL)
-            
-            print("Creating indexes...")
-            cursor.execute(CREATE_INDEXES_SQL)
-            
-            print("Creating views...")
-            cursor.execute(CREATE_VIEWS_SQL)
-            
-            print("Setting permissions...")
-            cursor.execute(GRANT_PERMISSIONS_SQL)
+        # One transaction: a failing statement rolls the whole setup back
+        with pooled_connection(connection_params) as conn:
+            with conn.cursor() as cursor:
+                print("Creating schema, tables, indexes, views and permissions...")
+                cursor.execute(SCHEMA_SQL)
+            conn.commit()
+        
+        print("Creating indexes...")
+        build_indexes(connection_params)
         
         print("Database schema created successfully!")
         
         # Test the setup
         print("\nTesting schema...")
-        with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-            cursor.execute("""
-                SELECT table_name 
-                FROM information_schema.tables 
-                WHERE table_schema = 'pricing'
-                ORDER BY table_name
-            """)
-            tables = cursor.fetchall()
-            print(f"Created tables: {[t['table_name'] for t in tables]}")
-            
-            cursor.execute("""
-                SELECT viewname 
-                FROM pg_views 
-                WHERE schemaname = 'pricing'
-                ORDER BY viewname
-            """)
-            views = cursor.fetchall()
-            print(f"Created views: {[v['viewname'] for v in views]}")
+        with pooled_connection(connection_params) as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute("""
+                    SELECT table_name 
+                    FROM information_schema.tables 
+                    WHERE table_schema = 'pricing'
+                    ORDER BY table_name
+                """)
+                tables = cursor.fetchall()
+                print(f"Created tables: {[t['table_name'] for t in tables]}")
+                
+                cursor.execute("""
+                    SELECT viewname 
+                    FROM pg_views 
+                    WHERE schemaname = 'pricing'
+                    ORDER BY viewname
+                """)
+                views = cursor.fetchall()
+                print(f"Created views: {[v['viewname'] for v in views]}")
+                
+                cursor.execute("""
+                    SELECT matviewname 
+                    FROM pg_matviews 
+                    WHERE schemaname = 'pricing'
+                    ORDER BY matviewname
+                """)
+                matviews = cursor.fetchall()
+                print(f"Created materialized views: {[v['matviewname'] for v in matviews]}")
         
-        conn.close()
         return True
         
     except Exception as e:
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+
+import threading
+from contextlib import contextmanager
+
+from psycopg2.pool import ThreadedConnectionPool
+
+
+POOL_MIN_CONNECTIONS = 1
+POOL_MAX_CONNECTIONS = 16
+
+# One pool per set of connection parameters, shared by every caller in the process.
+# psycopg2 keeps up to POOL_MIN_CONNECTIONS idle and closes any extra ones on return
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(connection_params):
+    """Return the process-wide connection pool for these connection parameters"""
+    key = tuple(sorted(connection_params.items()))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = ThreadedConnectionPool(POOL_MIN_CONNECTIONS, POOL_MAX_CONNECTIONS, **connection_params)
+            _pools[key] = pool
+        return pool
+
+
+@contextmanager
+def pooled_connection(connection_params, autocommit=False):
+    """Borrow a connection from the pool, rolling back on error and handing it back when done"""
+    pool = get_pool(connection_params)
+    conn = pool.getconn()
+    try:
+        conn.autocommit = autocommit
+        yield conn
+    except Exception:
+        if not conn.closed and not conn.autocommit:
+            conn.rollback()
+        raise
+    finally:
+        # The next borrower expects a transactional connection
+        if autocommit and not conn.closed:
+            conn.autocommit = False
+        pool.putconn(conn)
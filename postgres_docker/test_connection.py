@@ -4,6 +4,10 @@
 import psycopg2
 from psycopg2.extras import RealDictCursor
 import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+from postgres_docker.db import pooled_connection
 
 def test_connection():
     connection_params = {
@@ -17,7 +21,7 @@ def test_connection():
     try:
         print("Testing database connection...")
         
-        with psycopg2.connect(**connection_params) as conn:
+        with pooled_connection(connection_params) as conn:
             with conn.cursor(cursor_factory=RealDictCursor) as cursor:
                 cursor.execute("SELECT version();")
                 version = cursor.fetchone()
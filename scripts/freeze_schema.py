@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Regenerate PRICING/models/_frozen_schema.py from the pricing models.
+
+Run this after changing any model in PRICING/models/pricing.py and commit the result:
+
+    python scripts/freeze_schema.py
+
+With --check nothing is written; the script exits non-zero when the committed file
+no longer matches the models (run by the pre-commit hook):
+
+    python scripts/freeze_schema.py --check
+"""
+
+import sys
+from pathlib import Path
+
+PRICING_DIR = Path(__file__).parent.parent / 'PRICING'
+sys.path.insert(0, str(PRICING_DIR))
+from models.pricing import _build_response_format
+
+OUTPUT_PATH = PRICING_DIR / 'models' / '_frozen_schema.py'
+
+HEADER = '''# Generated by scripts/freeze_schema.py from models/pricing.py; do not edit by hand.
+# Strict OpenAI response format for ContractExtraction, precomputed so no schema
+# generation or traversal runs at import time.
+
+'''
+
+
+def to_literal(value, level=0):
+    """Python source for a JSON-like value, one key or item per line, keeping key order"""
+    indent = '    ' * (level + 1)
+    closing = '    ' * level
+    if isinstance(value, dict) and value:
+        items = [f"{indent}{key!r}: {to_literal(item, level + 1)}" for key, item in value.items()]
+        return "{\n" + ",\n".join(items) + f"\n{closing}}}"
+    if isinstance(value, list) and value:
+        items = [f"{indent}{to_literal(item, level + 1)}" for item in value]
+        return "[\n" + ",\n".join(items) + f"\n{closing}]"
+    return repr(value)
+
+
+def check(response_format):
+    """Whether the committed frozen schema matches the one built from the models"""
+    try:
+        from models._frozen_schema import RESPONSE_FORMAT
+    except ImportError:
+        return False
+    return RESPONSE_FORMAT == response_format
+
+
+def main():
+    response_format = _build_response_format()
+    
+    if '--check' in sys.argv[1:]:
+        if not check(response_format):
+            print(f"{OUTPUT_PATH} is out of date; run python scripts/freeze_schema.py")
+            sys.exit(1)
+        print(f"{OUTPUT_PATH} is up to date")
+        return
+    
+    OUTPUT_PATH.write_text(f"{HEADER}RESPONSE_FORMAT = {to_literal(response_format)}\n")
+    print(f"Wrote {OUTPUT_PATH}")
+
+
+if __name__ == "__main__":
+    main()